@@ -1,11 +1,13 @@
 import traceback
 from http import HTTPStatus
-from typing import Dict, Iterable, List
-import json
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List
 import os
 
-from flask import request, Response
+from flask import current_app, g, request, Response, stream_with_context
 from flask_restx import Resource
+from pydantic import BaseModel, ValidationError
+import orjson
 
 from mindsdb.interfaces.agents.agents_controller import AgentsController
 from mindsdb.interfaces.storage import db
@@ -15,10 +17,49 @@ from mindsdb.api.executor.controllers.session_controller import SessionControlle
 from mindsdb.metrics.metrics import api_endpoint_metrics
 from mindsdb.utilities.log import getLogger
 from mindsdb.utilities.exception import EntityNotExistsError
+from mindsdb.utilities.json_encoder import CustomJSONEncoder
 
 
 logger = getLogger(__name__)
 
+# Environment is read once at import: these values don't change during the process lifetime.
+_OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+
+# Datetimes are passed through to the encoder so they are formatted the same way as in other HTTP responses.
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+_orjson_default = CustomJSONEncoder().default
+
+
+class AgentRequest(BaseModel):
+    '''Body of requests that create or update a single agent'''
+    agent: Dict[str, Any]
+
+
+class AgentsBatchRequest(BaseModel):
+    '''Body of requests that create several agents'''
+    agents: List[Dict[str, Any]]
+
+
+class CompletionRequest(BaseModel):
+    '''Body of agent completion requests'''
+    messages: List[Dict[str, Any]]
+
+
+def _get_agents_controller() -> AgentsController:
+    '''Returns the AgentsController for the current request, creating it on first use'''
+    agents_controller = getattr(g, '_agents_controller', None)
+    if agents_controller is None:
+        agents_controller = g._agents_controller = AgentsController()
+    return agents_controller
+
+
+def _get_session_controller() -> SessionController:
+    '''Returns the SessionController for the current request, creating it on first use'''
+    session = getattr(g, '_session_controller', None)
+    if session is None:
+        session = g._session_controller = SessionController()
+    return session
+
 
 def create_agent(project_name, name, agent):
     if name is None:
@@ -40,7 +81,7 @@ def create_agent(project_name, name, agent):
     params = agent.get('params', {})
     skills = agent.get('skills', [])
 
-    agents_controller = AgentsController()
+    agents_controller = _get_agents_controller()
 
     try:
         existing_agent = agents_controller.get_agent(name, project_name=project_name)
@@ -90,7 +131,7 @@ class AgentsResource(Resource):
     @api_endpoint_metrics('GET', '/agents')
     def get(self, project_name):
         ''' List all agents '''
-        session = SessionController()
+        session = _get_session_controller()
         try:
             all_agents = session.agents_controller.get_agents(project_name)
         except EntityNotExistsError:
@@ -99,7 +140,17 @@ class AgentsResource(Resource):
                 HTTPStatus.NOT_FOUND,
                 'Project not found',
                 f'Project with name {project_name} does not exist')
-        return [a.as_dict() for a in all_agents]
+
+        # Same datetime formatting as the app's JSON provider, which serializes the other responses.
+        default = current_app.json.default
+
+        # Every agent is serialized before anything is sent, so a failure still ends in a proper error response.
+        frames = [
+            orjson.dumps(agent.as_dict(), default=default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+            for agent in all_agents
+        ]
+
+        return Response(b'[' + b','.join(frames) + b']', mimetype='application/json')
 
     @ns_conf.doc('create_agent')
     @api_endpoint_metrics('POST', '/agents')
@@ -107,19 +158,93 @@ class AgentsResource(Resource):
         '''Create a agent'''
 
         # Check for required parameters.
-        if 'agent' not in request.json:
+        try:
+            body = AgentRequest.model_validate_json(request.get_data())
+        except ValidationError:
             return http_error(
                 HTTPStatus.BAD_REQUEST,
                 'Missing parameter',
                 'Must provide "agent" parameter in POST body'
             )
 
-        agent = request.json['agent']
+        agent = body.agent
 
         name = agent.get('name')
         return create_agent(project_name, name, agent)
 
 
+@ns_conf.route('/<project_name>/agents:batch')
+@ns_conf.param('project_name', 'Name of the project')
+class AgentsBatchResource(Resource):
+    @ns_conf.doc('create_agents_batch')
+    @api_endpoint_metrics('POST', '/agents:batch')
+    def post(self, project_name):
+        '''Create several agents
+
+        Each agent is created on its own, so the valid agents are saved even if others fail.
+        The response lists the result of every agent, with status 201 if all of them were created and 207 otherwise.
+        '''
+
+        # Check for required parameters.
+        try:
+            body = AgentsBatchRequest.model_validate_json(request.get_data())
+        except ValidationError:
+            return http_error(
+                HTTPStatus.BAD_REQUEST,
+                'Missing parameter',
+                'Must provide "agents" list parameter in POST body'
+            )
+
+        agents_controller = _get_agents_controller()
+        try:
+            agents_controller.project_controller.get(name=project_name)
+        except EntityNotExistsError:
+            # Project must exist.
+            return http_error(
+                HTTPStatus.NOT_FOUND,
+                'Project not found',
+                f'Project with name {project_name} does not exist'
+            )
+
+        results = []
+        for agent in body.agents:
+            name = agent.get('name')
+            if name is None or 'model_name' not in agent:
+                results.append({'name': name, 'status': 'error', 'error': 'Agent must have "name" and "model_name" fields'})
+                continue
+            # Every agent gets its own savepoint, so a failed one does not leave anything behind in the session.
+            # The created agents are committed once below.
+            savepoint = db.session.begin_nested()
+            try:
+                agents_controller.add_agent(
+                    name=name,
+                    project_name=project_name,
+                    model_name=agent['model_name'],
+                    skills=agent.get('skills', []),
+                    provider=agent.get('provider'),
+                    params=agent.get('params', {}),
+                    commit=False
+                )
+                savepoint.commit()
+                results.append({'name': name, 'status': 'created'})
+            except (ValueError, NotImplementedError) as e:
+                savepoint.rollback()
+                results.append({'name': name, 'status': 'error', 'error': str(e)})
+            except Exception:
+                savepoint.rollback()
+                logger.error(f'Error creating agent {name}: {traceback.format_exc()}')
+                results.append({'name': name, 'status': 'error', 'error': 'Unexpected error while creating the agent'})
+
+        db.session.commit()
+
+        all_created = all(result['status'] == 'created' for result in results)
+        return Response(
+            orjson.dumps(results),
+            status=HTTPStatus.CREATED if all_created else HTTPStatus.MULTI_STATUS,
+            mimetype='application/json'
+        )
+
+
 @ns_conf.route('/<project_name>/agents/<agent_name>')
 @ns_conf.param('project_name', 'Name of the project')
 @ns_conf.param('agent_name', 'Name of the agent')
@@ -128,7 +253,7 @@ class AgentResource(Resource):
     @api_endpoint_metrics('GET', '/agents/agent')
     def get(self, project_name, agent_name):
         '''Gets an agent by name'''
-        session = SessionController()
+        session = _get_session_controller()
         try:
             existing_agent = session.agents_controller.get_agent(agent_name, project_name=project_name)
             if existing_agent is None:
@@ -152,13 +277,15 @@ class AgentResource(Resource):
         '''Updates an agent by name, creating one if it doesn't exist'''
 
         # Check for required parameters.
-        if 'agent' not in request.json:
+        try:
+            body = AgentRequest.model_validate_json(request.get_data())
+        except ValidationError:
             return http_error(
                 HTTPStatus.BAD_REQUEST,
                 'Missing parameter',
                 'Must provide "agent" parameter in POST body'
             )
-        agents_controller = AgentsController()
+        agents_controller = _get_agents_controller()
 
         try:
             existing_agent = agents_controller.get_agent(agent_name, project_name=project_name)
@@ -170,7 +297,7 @@ class AgentResource(Resource):
                 f'Project with name {project_name} does not exist'
             )
 
-        agent = request.json['agent']
+        agent = body.agent
         name = agent.get('name', None)
         model_name = agent.get('model_name', None)
         skills_to_add = agent.get('skills_to_add', [])
@@ -199,7 +326,7 @@ class AgentResource(Resource):
                 params = {}
 
             # Check if any of the skills to be added is of type 'retrieval'
-            session = SessionController()
+            session = _get_session_controller()
             skills_controller = session.skills_controller
             retrieval_skill_added = any(
                 skills_controller.get_skill(skill_name).type == 'retrieval'
@@ -234,7 +361,7 @@ class AgentResource(Resource):
     @api_endpoint_metrics('DELETE', '/agents/agent')
     def delete(self, project_name, agent_name):
         '''Deletes a agent by name'''
-        agents_controller = AgentsController()
+        agents_controller = _get_agents_controller()
 
         try:
             existing_agent = agents_controller.get_agent(agent_name, project_name=project_name)
@@ -256,76 +383,102 @@ class AgentResource(Resource):
         return '', HTTPStatus.NO_CONTENT
 
 
+def _sse_frame(data) -> bytes:
+    return b'data: ' + orjson.dumps(data, default=_orjson_default, option=_ORJSON_OPTIONS) + b'\n\n'
+
+
+_ACTION_FIELDS = ('tool', 'tool_input', 'log')
+_get_action_fields = attrgetter(*_ACTION_FIELDS)
+_get_step_observation = attrgetter('observation')
+
+
+def _serialize_messages(messages: List) -> List[Dict]:
+    return [{'content': str(m.content) if hasattr(m, 'content') else str(m)} for m in messages]
+
+
+def _serialize_actions(actions: List) -> List[Dict]:
+    try:
+        return [dict(zip(_ACTION_FIELDS, _get_action_fields(a))) for a in actions]
+    except AttributeError:
+        # Some actions are not AgentAction-like objects (e.g. already stringified).
+        return [{
+            'tool': getattr(a, 'tool', str(a)),
+            'tool_input': getattr(a, 'tool_input', ''),
+            'log': getattr(a, 'log', '')
+        } for a in actions]
+
+
+def _serialize_steps(steps: List) -> List[Dict]:
+    try:
+        return [{'observation': _get_step_observation(s)} for s in steps]
+    except AttributeError:
+        return [{'observation': getattr(s, 'observation', str(s))} for s in steps]
+
+
+def _passthrough(value):
+    return value
+
+
+# Fields forwarded from a completion chunk to the client, with the transform applied to each.
+_CHUNK_FIELD_SERIALIZERS = {
+    'type': _passthrough,
+    'prompt': _passthrough,
+    'output': _passthrough,
+    'messages': _serialize_messages,
+    'actions': _serialize_actions,
+    'steps': _serialize_steps,
+    'context': _passthrough,
+}
+
+
 def _completion_event_generator(
-        agent_name: str,
+        existing_agent: db.Agents,
         messages: List[Dict],
-        project_name: str) -> Iterable[str]:
-    logger.info(f"Starting completion event generator for agent {agent_name}")
-
-    def json_serialize(data):
-        return f'data: {json.dumps(data)}\n\n'
+        project_name: str) -> Iterable[bytes]:
+    logger.info(f"Starting completion event generator for agent {existing_agent.name}")
 
-    yield json_serialize({"quick_response": True, "output": "I understand your request. I'm working on a detailed response for you."})
+    yield _sse_frame({"quick_response": True, "output": "I understand your request. I'm working on a detailed response for you."})
     logger.info("Quick response sent")
 
     try:
         # Populate API key by default if not present.
-        session = SessionController()
-        existing_agent = session.agents_controller.get_agent(agent_name, project_name=project_name)
-        if not existing_agent.params:
-            existing_agent.params = {}
-        existing_agent.params['openai_api_key'] = existing_agent.params.get('openai_api_key',
-                                                                            os.getenv('OPENAI_API_KEY'))
-        # Have to commit/flush here so DB isn't locked while streaming.
-        db.session.commit()
+        session = _get_session_controller()
+        params = dict(existing_agent.params or {})
+        params.setdefault('openai_api_key', _OPENAI_API_KEY)
 
+        # The params are passed separately, so the key is only used for this completion and never stored in the agent.
         completion_stream = session.agents_controller.get_completion(
             existing_agent,
             messages,
             project_name=project_name,
             tools=[],
-            stream=True
+            stream=True,
+            params=params
         )
 
         for chunk in completion_stream:
             if isinstance(chunk, str) and chunk.startswith('data: '):
-                # The chunk is already formatted correctly, yield it as is
-                yield chunk
+                # The chunk is already formatted correctly, only encode it so every frame is bytes
+                yield chunk.encode()
             elif isinstance(chunk, dict):
                 if 'error' in chunk:
                     # Handle error chunks
                     logger.error(f"Error in completion stream: {chunk['error']}")
-                    yield json_serialize({"error": chunk['error']})
+                    yield _sse_frame({"error": chunk['error']})
                 elif chunk.get('type') == 'context':
                     # Handle context message
-                    yield json_serialize({"type": "context", "content": chunk.get('content')})
+                    yield _sse_frame({"type": "context", "content": chunk.get('content')})
                 else:
                     # Process and yield other types of chunks
-                    chunk_obj = {}
-                    if 'type' in chunk:
-                        chunk_obj['type'] = chunk['type']
-                    if 'prompt' in chunk:
-                        chunk_obj['prompt'] = chunk['prompt']
-                    if 'output' in chunk:
-                        chunk_obj['output'] = chunk['output']
-                    if 'messages' in chunk:
-                        chunk_obj['messages'] = [{'content': str(m.content) if hasattr(m, 'content') else str(m)} for m
-                                                 in chunk['messages']]
-                    if 'actions' in chunk:
-                        chunk_obj['actions'] = [{
-                            'tool': getattr(a, 'tool', str(a)),
-                            'tool_input': getattr(a, 'tool_input', ''),
-                            'log': getattr(a, 'log', '')
-                        } for a in chunk['actions']]
-                    if 'steps' in chunk:
-                        chunk_obj['steps'] = [{'observation': getattr(s, 'observation', str(s))} for s in chunk['steps']]
-                    if 'context' in chunk:
-                        chunk_obj['context'] = chunk['context']
-
-                    yield json_serialize(chunk_obj)
+                    # Walk the (few) keys of the chunk rather than every supported field.
+                    chunk_obj = {
+                        key: _CHUNK_FIELD_SERIALIZERS[key](value)
+                        for key, value in chunk.items() if key in _CHUNK_FIELD_SERIALIZERS
+                    }
+                    yield _sse_frame(chunk_obj)
             else:
                 # For any other unexpected chunk types
-                yield json_serialize({"output": str(chunk)})
+                yield _sse_frame({"output": str(chunk)})
 
             logger.debug(f"Streamed chunk: {str(chunk)[:100]}...")
 
@@ -335,10 +488,10 @@ def _completion_event_generator(
         error_message = f"Error in completion event generator: {str(e)}"
         logger.error(error_message)
         logger.error(traceback.format_exc())
-        yield json_serialize({"error": error_message})
+        yield _sse_frame({"error": error_message})
 
     finally:
-        yield json_serialize({"type": "end"})
+        yield _sse_frame({"type": "end"})
 
 
 @ns_conf.route('/<project_name>/agents/<agent_name>/completions/stream')
@@ -351,7 +504,9 @@ class AgentCompletionsStream(Resource):
         logger.info(f"Received streaming request for agent {agent_name} in project {project_name}")
 
         # Check for required parameters.
-        if 'messages' not in request.json:
+        try:
+            body = CompletionRequest.model_validate_json(request.get_data())
+        except ValidationError:
             logger.error("Missing 'messages' parameter in request body")
             return http_error(
                 HTTPStatus.BAD_REQUEST,
@@ -359,7 +514,7 @@ class AgentCompletionsStream(Resource):
                 'Must provide "messages" parameter in POST body'
             )
 
-        session = SessionController()
+        session = _get_session_controller()
         try:
             existing_agent = session.agents_controller.get_agent(agent_name, project_name=project_name)
             if existing_agent is None:
@@ -377,14 +532,15 @@ class AgentCompletionsStream(Resource):
                 f'Project with name {project_name} does not exist'
             )
 
-        messages = request.json['messages']
+        messages = body.messages
 
         try:
-            gen = _completion_event_generator(
-                agent_name,
+            # Keep the request context (and the DB session holding existing_agent) alive while streaming.
+            gen = stream_with_context(_completion_event_generator(
+                existing_agent,
                 messages,
                 project_name
-            )
+            ))
             logger.info(f"Starting streaming response for agent {agent_name}")
             return Response(gen, mimetype='text/event-stream')
         except Exception as e:
@@ -406,13 +562,15 @@ class AgentCompletions(Resource):
     def post(self, project_name, agent_name):
         '''Queries an agent given a list of messages'''
         # Check for required parameters.
-        if 'messages' not in request.json:
+        try:
+            body = CompletionRequest.model_validate_json(request.get_data())
+        except ValidationError:
             return http_error(
                 HTTPStatus.BAD_REQUEST,
                 'Missing parameter',
                 'Must provide "messages" parameter in POST body'
             )
-        agents_controller = AgentsController()
+        agents_controller = _get_agents_controller()
 
         try:
             existing_agent = agents_controller.get_agent(agent_name, project_name=project_name)
@@ -433,13 +591,13 @@ class AgentCompletions(Resource):
         # Add OpenAI API key to agent params if not already present.
         if not existing_agent.params:
             existing_agent.params = {}
-        existing_agent.params['openai_api_key'] = existing_agent.params.get('openai_api_key', os.getenv('OPENAI_API_KEY'))
+        existing_agent.params['openai_api_key'] = existing_agent.params.get('openai_api_key', _OPENAI_API_KEY)
 
         # set mode to `retrieval` if agent has a skill of type `retrieval` and mode is not set
         if 'mode' not in existing_agent.params and any(skill.type == 'retrieval' for skill in existing_agent.skills):
             existing_agent.params['mode'] = 'retrieval'
 
-        messages = request.json['messages']
+        messages = body.messages
 
         completion = agents_controller.get_completion(
             existing_agent,
@@ -466,8 +624,8 @@ class AgentCompletions(Resource):
                 try:
                     last_context = completion.iloc[-1]['context']
                     if last_context:
-                        context = json.loads(last_context)
-                except (json.JSONDecodeError, IndexError) as e:
+                        context = orjson.loads(last_context)
+                except (orjson.JSONDecodeError, IndexError) as e:
                     logger.error(f'Error decoding context: {e}')
                     pass  # Keeping context as an empty list in case of error
 
@@ -66,14 +66,16 @@ class SkillsResource(Resource):
     def post(self, project_name):
         '''Create a skill'''
 
+        body = request.get_json(cache=True, silent=True) or {}
+
         # Check required request format.
-        if 'skill' not in request.json:
+        if 'skill' not in body:
             return http_error(
                 HTTPStatus.BAD_REQUEST,
                 'Missing parameter',
                 'Must provide "skill" parameter in POST body'
             )
-        skill = request.json['skill']
+        skill = body['skill']
         return create_skill(project_name, skill)
 
 
@@ -110,8 +112,10 @@ class SkillResource(Resource):
         '''Updates a skill by name, creating one if it doesn't exist'''
         skills_controller = SkillsController()
 
+        body = request.get_json(cache=True, silent=True) or {}
+
         # Check required request format.
-        if 'skill' not in request.json:
+        if 'skill' not in body:
             return http_error(
                 HTTPStatus.BAD_REQUEST,
                 'Missing parameter',
@@ -128,7 +132,7 @@ class SkillResource(Resource):
                 f'Project with name {project_name} does not exist'
             )
 
-        skill = request.json['skill']
+        skill = body['skill']
         if existing_skill is None:
             # Use same name as provided in URL.
             skill['name'] = skill_name
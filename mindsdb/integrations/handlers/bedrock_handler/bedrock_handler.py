@@ -1,11 +1,14 @@
-import numpy as np
 import pandas as pd
 from typing import Text, Tuple, Dict, List, Optional, Any
 
 from mindsdb.utilities import log
 
 from mindsdb.integrations.libs.base import BaseMLEngine
-from mindsdb.integrations.libs.llm.utils import get_completed_prompts
+from mindsdb.integrations.libs.llm.utils import (
+    get_completed_prompts,
+    get_empty_prompt_ids,
+    get_empty_prompt_id_set,
+)
 from mindsdb.integrations.libs.api_handler_exceptions import MissingConnectionParams
 from mindsdb.integrations.handlers.bedrock_handler.utilities import create_amazon_bedrock_client
 from mindsdb.integrations.handlers.bedrock_handler.settings import AmazonBedrockHandlerEngineConfig, AmazonBedrockHandlerModelConfig
@@ -135,7 +138,8 @@ class AmazonBedrockHandler(BaseMLEngine):
             questions, empty_prompt_ids = self._prepare_data_with_prompt_template(df, prompt_template)
 
         # Prepare the prompts.
-        questions = [question for i, question in enumerate(questions) if i not in empty_prompt_ids]
+        empty_prompt_id_set = get_empty_prompt_id_set(empty_prompt_ids)
+        questions = [question for i, question in enumerate(questions) if i not in empty_prompt_id_set]
         prompts = [{"role": "user", "content": [{"text": question}]} for question in questions]
 
         return prompts, empty_prompt_ids
@@ -170,7 +174,8 @@ class AmazonBedrockHandler(BaseMLEngine):
             questions, empty_prompt_ids = self._prepare_data_with_prompt_template(df, prompt_template)
 
         # Prepare the prompts.
-        questions = [question for i, question in enumerate(questions) if i not in empty_prompt_ids]
+        empty_prompt_id_set = get_empty_prompt_id_set(empty_prompt_ids)
+        questions = [question for i, question in enumerate(questions) if i not in empty_prompt_id_set]
         prompt = [{"role": "user", "content": [{"text": question} for question in questions]}]
 
         # Get the total number of questions; including the empty ones.
@@ -197,14 +202,9 @@ class AmazonBedrockHandler(BaseMLEngine):
             raise ValueError(f"Column {context_column} not found in the dataframe!")
 
         if context_column:
-            empty_prompt_ids = np.where(
-                df[[context_column, question_column]]
-                .isna()
-                .all(axis=1)
-                .values
-            )[0]
-            contexts = list(df[context_column].apply(lambda x: str(x)))
-            questions_without_context = list(df[question_column].apply(lambda x: str(x)))
+            empty_prompt_ids = get_empty_prompt_ids(df, [context_column, question_column])
+            contexts = df[context_column].astype(str).tolist()
+            questions_without_context = df[question_column].astype(str).tolist()
 
             questions = [
                 f'Context: {c}\nQuestion: {q}\nAnswer: '
@@ -212,10 +212,8 @@ class AmazonBedrockHandler(BaseMLEngine):
             ]
 
         else:
-            questions = list(df[question_column].apply(lambda x: str(x)))
-            empty_prompt_ids = np.where(
-                df[[question_column]].isna().all(axis=1).values
-            )[0]
+            questions = df[question_column].astype(str).tolist()
+            empty_prompt_ids = get_empty_prompt_ids(df, [question_column])
 
         return questions, empty_prompt_ids
 
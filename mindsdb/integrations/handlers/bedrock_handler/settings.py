@@ -4,7 +4,7 @@ from botocore.exceptions import ClientError
 from typing import Text, List, Dict, Optional, Any, ClassVar
 from pydantic import BaseModel, Field, model_validator, field_validator
 
-from mindsdb.integrations.handlers.bedrock_handler.utilities import create_amazon_bedrock_client
+from mindsdb.integrations.handlers.bedrock_handler.utilities import create_amazon_bedrock_client, get_amazon_bedrock_foundation_models
 from mindsdb.integrations.utilities.handlers.validation_utilities import ParameterValidationUtilities
 
 
@@ -61,46 +61,39 @@ class AmazonBedrockHandlerEngineConfig(BaseModel):
 
     @model_validator(mode="before")
     @classmethod
-    def check_if_params_contain_typos(cls, values: Any) -> Any:
+    def check_params_and_access_to_amazon_bedrock(cls, values: Any) -> Any:
         """
-        Checks if there are any typos in the parameters.
+        Checks if there are any typos in the parameters, and if the AWS credentials provided are valid.
+        Both checks are done in a single pass over the parameters provided.
 
         Args:
             values (Any): The parameters provided when creating an engine via the Amazon Bedrock handler.
 
         Raises:
-            ValueError: If there are any typos in the parameters.
+            ValueError: If there are any typos in the parameters or the AWS credentials are invalid.
         """
         ParameterValidationUtilities.validate_parameter_spelling(cls, values)
 
-        return values
-
-    @model_validator(mode="after")
-    @classmethod
-    def check_access_to_amazon_bedrock(cls, model: BaseModel) -> BaseModel:
-        """
-        Checks if the AWS credentials provided are valid and Amazon Bedrock is accessible.
-
-        Args:
-            model (BaseModel): The parameters provided when creating an engine via the Amazon Bedrock handler.
-
-        Raises:
-            ValueError: If the AWS credentials are invalid or Amazon Bedrock is not accessible.
-        """
-        bedrock_client = create_amazon_bedrock_client(
-            "bedrock",
-            model.aws_access_key_id,
-            model.aws_secret_access_key,
-            model.region_name,
-            model.aws_session_token
+        # Missing parameters are reported by the field validation.
+        if not all(key in values for key in ('aws_access_key_id', 'aws_secret_access_key', 'region_name')):
+            return values
+
+        # GetCallerIdentity is a lightweight call that only verifies the credentials.
+        # Access to Amazon Bedrock itself is verified when the model ID is validated.
+        sts_client = create_amazon_bedrock_client(
+            "sts",
+            values['aws_access_key_id'],
+            values['aws_secret_access_key'],
+            values['region_name'],
+            values.get('aws_session_token')
         )
 
         try:
-            bedrock_client.list_foundation_models()
+            sts_client.get_caller_identity()
         except ClientError as e:
             raise ValueError(f"Invalid Amazon Bedrock credentials: {e}!")
 
-        return model
+        return values
 
 
 class AmazonBedrockHandlerModelConfig(BaseModel):
@@ -160,18 +153,62 @@ class AmazonBedrockHandlerModelConfig(BaseModel):
 
     @model_validator(mode="before")
     @classmethod
-    def check_if_params_contain_typos(cls, values: Any) -> Any:
+    def check_params_and_model_id(cls, values: Any) -> Any:
         """
-        Checks if there are any typos in the parameters.
+        Checks if there are any typos in the parameters, and if the model ID is valid and correct for the mode.
+        If a model ID is not provided, the default model ID for that mode will be used.
+        Both checks are done in a single pass over the parameters provided.
 
         Args:
             values (Any): The parameters provided when creating a model via the Amazon Bedrock handler.
 
         Raises:
-            ValueError: If there are any typos in the parameters.
+            ValueError: If there are any typos in the parameters, or the model ID provided is invalid or not suitable for the mode.
         """
         ParameterValidationUtilities.validate_parameter_spelling(cls, values)
 
+        mode = values.get('mode', AmazonBedrockHandlerSettings.DEFAULT_MODE)
+        # Unsupported modes are reported by the field validation.
+        if mode not in AmazonBedrockHandlerSettings.SUPPORTED_MODES:
+            return values
+
+        # TODO: Set the default model ID for other modes.
+        model_id = values.get('model_id')
+        if model_id is None:
+            if mode in ['default', 'conversational']:
+                model_id = values['model_id'] = AmazonBedrockHandlerSettings.DEFAULT_TEXT_MODEL_ID
+            else:
+                raise ValueError(f"A model ID is required for the {mode} mode!")
+
+        # This runs before the field validation, so the connection arguments are checked here.
+        connection_args = values.get('connection_args')
+        if not isinstance(connection_args, dict) or not all(
+            connection_args.get(key) for key in ('aws_access_key_id', 'aws_secret_access_key', 'region_name')
+        ):
+            raise ValueError("The AWS credentials of the engine (aws_access_key_id, aws_secret_access_key and region_name) are required!")
+        connection_args = {
+            key: connection_args.get(key)
+            for key in ('aws_access_key_id', 'aws_secret_access_key', 'region_name', 'aws_session_token')
+        }
+
+        try:
+            # Check if the model ID is valid and accessible.
+            # Plain model IDs are looked up in the (cached) list of foundation models; anything else, e.g. an ARN, is fetched directly.
+            model_details = get_amazon_bedrock_foundation_models(**connection_args).get(model_id)
+            if model_details is None:
+                bedrock_client = create_amazon_bedrock_client(
+                    "bedrock",
+                    **connection_args
+                )
+                model_details = bedrock_client.get_foundation_model(modelIdentifier=model_id)['modelDetails']
+        except ClientError as e:
+            raise ValueError(f"Invalid Amazon Bedrock model ID: {e}!")
+
+        # Check if the model is suitable for the mode provided.
+        if mode in ['default', 'conversational']:
+            if 'TEXT' not in model_details['outputModalities']:
+                raise ValueError(f"The models used for the {mode} should support text generation!")
+
         return values
 
     @field_validator("mode")
@@ -191,42 +228,6 @@ class AmazonBedrockHandlerModelConfig(BaseModel):
 
         return mode
 
-    @model_validator(mode="after")
-    @classmethod
-    def check_if_model_id_is_valid_and_correct_for_mode(cls, model: BaseModel) -> BaseModel:
-        """
-        Checks if the model ID and the parameters provided for the model are valid.
-        If a model ID is not provided, the default model ID for that mode will be used.
-
-        Args:
-            values (Any): The parameters provided when creating a model via the Amazon Bedrock handler.
-
-        Raises:
-            ValueError: If the model ID provided is invalid or the parameters provided are invalid for the chosen model.
-        """
-        # TODO: Set the default model ID for other modes.
-        if model.model_id is None:
-            if model.mode in ['default', 'conversational']:
-                model.model_id = AmazonBedrockHandlerSettings.DEFAULT_TEXT_MODEL_ID
-
-        bedrock_client = create_amazon_bedrock_client(
-            "bedrock",
-            **model.connection_args
-        )
-
-        try:
-            # Check if the model ID is valid and accessible.
-            response = bedrock_client.get_foundation_model(modelIdentifier=model.model_id)
-        except ClientError as e:
-            raise ValueError(f"Invalid Amazon Bedrock model ID: {e}!")
-
-        # Check if the model is suitable for the mode provided.
-        if model.mode in ['default', 'conversational']:
-            if 'TEXT' not in response['modelDetails']['outputModalities']:
-                raise ValueError(f"The models used for the {model.mode} should support text generation!")
-
-        return model
-
     @model_validator(mode="after")
     @classmethod
     def check_if_params_are_valid_for_mode(cls, model: BaseModel) -> BaseModel:
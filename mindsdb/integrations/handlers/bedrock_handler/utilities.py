@@ -1,7 +1,19 @@
+import threading
+import time
 import boto3
-from typing import Text, Optional
+from functools import lru_cache
+from typing import Text, Optional, Dict
 
 
+# Foundation model listings are cached for this many seconds, per set of credentials.
+FOUNDATION_MODELS_CACHE_TTL = 300
+# Temporary credentials rotate, so the number of cached listings is bounded as well.
+FOUNDATION_MODELS_CACHE_MAX_SIZE = 32
+_foundation_models_cache = {}
+_foundation_models_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=32)
 def create_amazon_bedrock_client(
     client: Text,
     aws_access_key_id: Text,
@@ -11,11 +23,12 @@ def create_amazon_bedrock_client(
 ) -> boto3.client:
     """
     Create an Amazon Bedrock client via boto3.
+    Clients are thread-safe, so they are cached and reused for the same arguments.
 
     Parameters
     ----------
     client : Text
-        The type of client to create. It can be 'bedrock' or 'bedrock-runtime'.
+        The type of client to create. It can be 'bedrock', 'bedrock-runtime' or 'sts' (to verify credentials).
 
     aws_access_key_id : Text
         The AWS access key ID.
@@ -34,8 +47,8 @@ def create_amazon_bedrock_client(
     boto3.client
         Amazon Bedrock client.
     """
-    if client not in ["bedrock", "bedrock-runtime"]:
-        raise ValueError("The client must be 'bedrock' or 'bedrock-runtime'")
+    if client not in ["bedrock", "bedrock-runtime", "sts"]:
+        raise ValueError("The client must be 'bedrock', 'bedrock-runtime' or 'sts'")
 
     return boto3.client(
         client,
@@ -44,3 +57,62 @@ def create_amazon_bedrock_client(
         region_name=region_name,
         aws_session_token=aws_session_token,
     )
+
+
+def get_amazon_bedrock_foundation_models(
+    aws_access_key_id: Text,
+    aws_secret_access_key: Text,
+    region_name: Text,
+    aws_session_token: Optional[Text] = None,
+) -> Dict[Text, Dict]:
+    """
+    Get the foundation models available in Amazon Bedrock, using a short-lived cache.
+
+    Parameters
+    ----------
+    aws_access_key_id : Text
+        The AWS access key ID.
+
+    aws_secret_access_key : Text
+        The AWS secret access key.
+
+    region_name : Text
+        The AWS region name.
+
+    aws_session_token : Text, Optional
+        The AWS session token. Optional, but required for temporary security credentials.
+
+    Returns
+    -------
+    Dict[Text, Dict]
+        Model summaries keyed by model ID.
+    """
+    key = (aws_access_key_id, aws_secret_access_key, region_name, aws_session_token)
+    with _foundation_models_cache_lock:
+        record = _foundation_models_cache.get(key)
+    if record is not None and record['expired_at'] > time.time():
+        return record['models']
+
+    bedrock_client = create_amazon_bedrock_client(
+        "bedrock",
+        aws_access_key_id,
+        aws_secret_access_key,
+        region_name,
+        aws_session_token
+    )
+    response = bedrock_client.list_foundation_models()
+    models = {summary['modelId']: summary for summary in response['modelSummaries']}
+
+    # Drop expired listings (and the credentials they are keyed by) before adding a new one.
+    # The lock keeps concurrent validators from changing the cache while it is iterated.
+    with _foundation_models_cache_lock:
+        now = time.time()
+        for expired_key in [k for k, v in _foundation_models_cache.items() if v['expired_at'] <= now]:
+            _foundation_models_cache.pop(expired_key, None)
+        if len(_foundation_models_cache) >= FOUNDATION_MODELS_CACHE_MAX_SIZE:
+            _foundation_models_cache.clear()
+        _foundation_models_cache[key] = {
+            'models': models,
+            'expired_at': now + FOUNDATION_MODELS_CACHE_TTL
+        }
+    return models
@@ -3,7 +3,6 @@ from typing import Dict, Optional
 
 from PIL import Image
 import requests
-import numpy as np
 from io import BytesIO
 import json
 import textwrap
@@ -12,7 +11,11 @@ import pandas as pd
 from mindsdb.integrations.libs.base import BaseMLEngine
 from mindsdb.utilities import log
 from mindsdb.utilities.config import Config
-from mindsdb.integrations.libs.llm.utils import get_completed_prompts
+from mindsdb.integrations.libs.llm.utils import (
+    get_completed_prompts,
+    get_empty_prompt_ids,
+    get_empty_prompt_id_set,
+)
 import concurrent.futures
 
 logger = log.getLogger(__name__)
@@ -67,28 +70,24 @@ class GoogleGeminiHandler(BaseMLEngine):
             ["json_struct", "input_text"],
             ["img_url", "ctx_column"],
         ]
-        for keys in keys_collection:
-            if keys[0] in args and any(
-                x[0] in args for x in keys_collection if x != keys
-            ):
-                raise Exception(
-                    textwrap.dedent(
-                        """\
-                    Please provide one of
-                        1) a `prompt_template`
-                        2) a `question_column` and an optional `context_column`
-                        3) a `json_struct`
-                        4) a `prompt' and 'user_column' and 'assistant_column`
-                        5) a `img_url` and optional `ctx_column` for mode=`vision`
-                """
-                    )
+        # the first key of each group selects a mode, so at most one of them can be given
+        if sum(keys[0] in args for keys in keys_collection) > 1:
+            raise Exception(
+                textwrap.dedent(
+                    """\
+                Please provide one of
+                    1) a `prompt_template`
+                    2) a `question_column` and an optional `context_column`
+                    3) a `json_struct`
+                    4) a `prompt' and 'user_column' and 'assistant_column`
+                    5) a `img_url` and optional `ctx_column` for mode=`vision`
+            """
                 )
+            )
 
         # for all args that are not expected, raise an error
-        known_args = set()
         # flatten of keys_collection
-        for keys in keys_collection:
-            known_args = known_args.union(set(keys))
+        known_args = set().union(*keys_collection)
 
         # TODO: need a systematic way to maintain a list of known args
         known_args = known_args.union(
@@ -155,14 +154,9 @@ class GoogleGeminiHandler(BaseMLEngine):
 
             # Disclaimer: The following code has been adapted from the OpenAI handler.
             elif args.get("context_column", False):
-                empty_prompt_ids = np.where(
-                    df[[args["context_column"], args["question_column"]]]
-                    .isna()
-                    .all(axis=1)
-                    .values
-                )[0]
-                contexts = list(df[args["context_column"]].apply(lambda x: str(x)))
-                questions = list(df[args["question_column"]].apply(lambda x: str(x)))
+                empty_prompt_ids = get_empty_prompt_ids(df, [args["context_column"], args["question_column"]])
+                contexts = df[args["context_column"]].astype(str).tolist()
+                questions = df[args["question_column"]].astype(str).tolist()
                 prompts = [
                     f"Give only answer for: \nContext: {c}\nQuestion: {q}\nAnswer: "
                     for c, q in zip(contexts, questions)
@@ -170,53 +164,62 @@ class GoogleGeminiHandler(BaseMLEngine):
 
                 # Disclaimer: The following code has been adapted from the OpenAI handler.
             elif args.get("json_struct", False):
-                empty_prompt_ids = np.where(
-                    df[[args["input_text"]]].isna().all(axis=1).values
-                )[0]
+                empty_prompt_ids = get_empty_prompt_ids(df, [args["input_text"]])
+                # Parse each row's json struct once and read the other columns as plain arrays, not per cell.
+                if "json_struct" in df.columns:
+                    row_json_structs = (
+                        df["json_struct"]
+                        .map(lambda x: json.loads(x) if isinstance(x, str) else x)
+                        .to_numpy()
+                    )
+                else:
+                    row_json_structs = None
+                    default_json_struct = "".join(
+                        f"{ind + 1}. {val}\n" for ind, val in enumerate(args["json_struct"].values())
+                    )
+                column_values = {
+                    column: df[column].astype(str).to_numpy()
+                    for column in df.columns
+                    if column != "json_struct"
+                }
+
+                base_prompt = textwrap.dedent(
+                    f"""\
+                    Using text starting after 'The text is:', give exactly {len(args['json_struct'])} answers to the questions:
+                    {{{{json_struct}}}}
+
+                    Answers should be in the same order as the questions.
+                    Answer should be in form of one JSON Object eg. {"{'key':'value',..}"} where key=question and value=answer.
+                    If there is no answer to the question in the text, put a -.
+                    Answers should be as short as possible, ideally 1-2 words (unless otherwise specified).
+
+                    The text is:
+                    {{{{{args['input_text']}}}}}
+                """
+                )
                 prompts = []
-                for i in df.index:
-                    if "json_struct" in df.columns:
-                        if isinstance(df["json_struct"][i], str):
-                            df["json_struct"][i] = json.loads(df["json_struct"][i])
-                        json_struct = ""
-                        for ind, val in enumerate(df["json_struct"][i].values()):
-                            json_struct = json_struct + f"{ind}. {val}\n"
+                for i in range(len(df)):
+                    if row_json_structs is not None:
+                        json_struct = "".join(
+                            f"{ind}. {val}\n" for ind, val in enumerate(row_json_structs[i].values())
+                        )
                     else:
-                        json_struct = ""
-                        for ind, val in enumerate(args["json_struct"].values()):
-                            json_struct = json_struct + f"{ind + 1}. {val}\n"
-
-                    p = textwrap.dedent(
-                        f"""\
-                        Using text starting after 'The text is:', give exactly {len(args['json_struct'])} answers to the questions:
-                        {{{{json_struct}}}}
-
-                        Answers should be in the same order as the questions.
-                        Answer should be in form of one JSON Object eg. {"{'key':'value',..}"} where key=question and value=answer.
-                        If there is no answer to the question in the text, put a -.
-                        Answers should be as short as possible, ideally 1-2 words (unless otherwise specified).
-
-                        The text is:
-                        {{{{{args['input_text']}}}}}
-                    """
-                    )
-                    p = p.replace("{{json_struct}}", json_struct)
-                    for column in df.columns:
-                        if column == "json_struct":
-                            continue
-                        p = p.replace(f"{{{{{column}}}}}", str(df[column][i]))
+                        json_struct = default_json_struct
+
+                    p = base_prompt.replace("{{json_struct}}", json_struct)
+                    for column, values in column_values.items():
+                        p = p.replace(f"{{{{{column}}}}}", values[i])
                     prompts.append(p)
             elif "prompt" in args:
                 empty_prompt_ids = []
                 prompts = list(df[args["user_column"]])
             else:
-                empty_prompt_ids = np.where(
-                    df[[args["question_column"]]].isna().all(axis=1).values
-                )[0]
-                prompts = list(df[args["question_column"]].apply(lambda x: str(x)))
+                empty_prompt_ids = get_empty_prompt_ids(df, [args["question_column"]])
+                prompts = df[args["question_column"]].astype(str).tolist()
 
         # remove prompts without signal from completion queue
-        prompts = [j for i, j in enumerate(prompts) if i not in empty_prompt_ids]
+        empty_prompt_id_set = get_empty_prompt_id_set(empty_prompt_ids)
+        prompts = [j for i, j in enumerate(prompts) if i not in empty_prompt_id_set]
 
         api_key = self._get_google_gemini_api_key(args)
         genai.configure(api_key=api_key)
@@ -263,9 +266,9 @@ class GoogleGeminiHandler(BaseMLEngine):
 
     def embedding_worker(self, args: Dict, df: pd.DataFrame):
         if args.get("question_column"):
-            prompts = list(df[args["question_column"]].apply(lambda x: str(x)))
+            prompts = df[args["question_column"]].astype(str).tolist()
             if args.get("title_column", None):
-                titles = list(df[args["title_column"]].apply(lambda x: str(x)))
+                titles = df[args["title_column"]].astype(str).tolist()
             else:
                 titles = None
 
@@ -323,14 +326,14 @@ class GoogleGeminiHandler(BaseMLEngine):
                 raise Exception(f"{url} is not vaild image URL..")
 
         if args.get("img_url"):
-            urls = list(df[args["img_url"]].apply(lambda x: str(x)))
+            urls = df[args["img_url"]].astype(str).tolist()
 
         else:
             raise Exception("Vision mode needs a img_url")
 
         prompts = None
         if args.get("ctx_column"):
-            prompts = list(df[args["ctx_column"]].apply(lambda x: str(x)))
+            prompts = df[args["ctx_column"]].astype(str).tolist()
 
         api_key = self._get_google_gemini_api_key(args)
         genai.configure(api_key=api_key)
@@ -1,20 +1,25 @@
-from concurrent.futures import as_completed, TimeoutError
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
+import asyncio
+import contextvars
+import hashlib
+import os
 import re
+import threading
 
 from langchain.agents import AgentExecutor
 from langchain.agents.initialize import initialize_agent
 from langchain.chains.conversation.memory import ConversationSummaryBufferMemory
 from langchain.schema import SystemMessage
-from langchain_core.prompts import PromptTemplate
-from langchain_core.messages import HumanMessage
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
 
-import numpy as np
+import orjson
 import pandas as pd
 
 from mindsdb.interfaces.agents.safe_output_parser import SafeOutputParser
 from mindsdb.interfaces.agents.langchain_agent import (
-    get_llm_provider, get_embedding_model_provider, create_chat_model, get_chat_model_params
+    get_llm_provider, get_embedding_model_provider, create_chat_model, get_chat_model_params, prepare_prompts,
+    fill_empty_prompt_results
 )
 
 from mindsdb.interfaces.agents.constants import (
@@ -35,13 +40,69 @@ from mindsdb.integrations.handlers.langchain_embedding_handler.langchain_embeddi
 from mindsdb.integrations.handlers.openai_handler.constants import CHAT_MODELS  # noqa, for dependency checker
 
 from mindsdb.utilities import log
-from mindsdb.utilities.context_executor import ContextThreadPoolExecutor
 
-_PARSING_ERROR_PREFIXES = ['An output parsing error occured', 'Could not parse LLM output']
+# Tuple, so it can be passed to str.startswith directly.
+_PARSING_ERROR_PREFIXES = ('An output parsing error occured', 'Could not parse LLM output')
+_INPUT_VARIABLE_RE = re.compile(r'{{(.*?)}}')
+
+# Chat models (and their params) are reused across predict calls with the same arguments.
+_CHAT_MODEL_CACHE_SIZE = 8
+_chat_model_cache = {}
+_chat_model_cache_lock = threading.Lock()
+
+# Agents of all predict calls run on one event loop in a background thread.
+# The async clients of the cached chat models are bound to the loop they were first used on, so the loop has to outlive the calls.
+_agent_loop = None
+_agent_loop_pid = None
+_agent_loop_lock = threading.Lock()
+
+# Default number of agent invocations in flight at once per predict call, same as the ThreadPoolExecutor default.
+_DEFAULT_MAX_CONCURRENT_AGENTS = min(32, (os.cpu_count() or 1) + 4)
 
 logger = log.getLogger(__name__)
 
 
+def _get_agent_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the event loop to run agents on, starting it on first use in this process.
+    """
+    global _agent_loop, _agent_loop_pid
+    with _agent_loop_lock:
+        # A forked process inherits the loop, but not the thread running it.
+        if _agent_loop is None or _agent_loop_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='langchain-agent-loop', daemon=True).start()
+            _agent_loop, _agent_loop_pid = loop, os.getpid()
+        return _agent_loop
+
+
+def _get_chat_model(args: Dict) -> Tuple[Dict, BaseChatModel]:
+    """
+    Returns the chat model params and the chat model for the given args, building them only on a cache miss.
+    Cached models keep their async HTTP clients, so they must only be awaited on the loop from `_get_agent_loop`.
+    """
+    key = hashlib.blake2b(
+        orjson.dumps(args, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    ).hexdigest()
+    cached = _chat_model_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Concurrent predicts missing on the same args must share one model (and one async client).
+    with _chat_model_cache_lock:
+        cached = _chat_model_cache.get(key)
+        if cached is not None:
+            return cached
+
+        model_kwargs = get_chat_model_params(args)
+        llm = create_chat_model(args, model_kwargs)
+        if len(_chat_model_cache) >= _CHAT_MODEL_CACHE_SIZE:
+            # Evict the oldest entry.
+            _chat_model_cache.pop(next(iter(_chat_model_cache)), None)
+        _chat_model_cache[key] = (model_kwargs, llm)
+        return model_kwargs, llm
+
+
 class LangChainHandler(BaseMLEngine):
     """
     This is a MindsDB integration for the LangChain library, which provides a unified interface for interacting with
@@ -75,21 +136,21 @@ class LangChainHandler(BaseMLEngine):
 
     def _handle_parsing_errors(self, error: Exception) -> str:
         response = str(error)
-        for p in _PARSING_ERROR_PREFIXES:
-            if response.startswith(p):
-                # As a somewhat dirty workaround, we accept the output formatted incorrectly and use it as a response.
-                #
-                # Ideally, in the future, we would write a parser that is more robust and flexible than the one Langchain uses.
-                # Response is wrapped in ``
-                logger.info('Handling parsing error, salvaging response...')
-                response_output = response.split('`')
-                if len(response_output) >= 2:
-                    response = response_output[-2]
-
-                # Wrap response in Langchain conversational react format.
-                langchain_react_formatted_response = f'''Thought: Do I need to use a tool? No
+        if response.startswith(_PARSING_ERROR_PREFIXES):
+            # As a somewhat dirty workaround, we accept the output formatted incorrectly and use it as a response.
+            #
+            # Ideally, in the future, we would write a parser that is more robust and flexible than the one Langchain uses.
+            # Response is wrapped in ``
+            logger.info('Handling parsing error, salvaging response...')
+            # Take the text between the last two backticks (or before the only one) without splitting the whole error.
+            end = response.rfind('`')
+            if end != -1:
+                response = response[response.rfind('`', 0, end) + 1:end]
+
+            # Wrap response in Langchain conversational react format.
+            langchain_react_formatted_response = f'''Thought: Do I need to use a tool? No
 AI: {response}'''
-                return langchain_react_formatted_response
+            return langchain_react_formatted_response
         return f'Agent failed with error:\n{str(error)}...'
 
     def create(self, target: str, args: Dict = None, **kwargs):
@@ -104,6 +165,9 @@ AI: {response}'''
             # use default prompt template for retrieval i.e. RAG if not provided
             if "prompt_template" not in args:
                 args["prompt_template"] = DEFAULT_RAG_PROMPT_TEMPLATE
+        if 'prompt_template' in args:
+            # Extracted once here, so predict doesn't have to scan the template on every call.
+            args['input_variables'] = _INPUT_VARIABLE_RE.findall(args['prompt_template'])
 
         self.model_storage.json_set('args', args)
 
@@ -141,11 +205,11 @@ AI: {response}'''
         if user_column not in df.columns:
             raise Exception(
                 f"Expected user input in column `{user_column}`, which is not found in the input data. Either provide the column, or redefine the expected column at model creation (`USING user_column = 'value'`)")  # noqa
-        df.iloc[:-1, df.columns.get_loc(user_column)] = None
+        df.loc[df.index[:-1], user_column] = None
         return self.run_agent(df, agent, args, pred_args)
 
     def call_llm(self, df, args=None, pred_args=None):
-        llm = create_chat_model({**args, **pred_args})
+        _, llm = _get_chat_model({**args, **pred_args})
 
         user_column = args.get('user_column', USER_COLUMN)
         assistant_column = args.get('assistant_column', ASSISTANT_COLUMN)
@@ -159,8 +223,7 @@ AI: {response}'''
         pred_args = pred_args if pred_args else {}
 
         # Set up tools.
-        model_kwargs = get_chat_model_params({**args, **pred_args})
-        llm = create_chat_model({**args, **pred_args})
+        model_kwargs, llm = _get_chat_model({**args, **pred_args})
 
         tools = setup_tools(llm,
                             model_kwargs,
@@ -176,17 +239,16 @@ AI: {response}'''
         memory = ConversationSummaryBufferMemory(llm=llm,
                                                  max_token_limit=model_kwargs.get('max_tokens', DEFAULT_MAX_TOKENS),
                                                  memory_key='chat_history')
-        memory.chat_memory.messages.insert(0, SystemMessage(content=prompt_template))
+        messages = [SystemMessage(content=prompt_template)]
         # User - Assistant conversation. All except the last message.
         user_column = args.get('user_column', USER_COLUMN)
         assistant_column = args.get('assistant_column', ASSISTANT_COLUMN)
-        for row in df[:-1].to_dict('records'):
-            question = row[user_column]
-            answer = row[assistant_column]
+        for question, answer in df[[user_column, assistant_column]].iloc[:-1].itertuples(index=False):
             if question:
-                memory.chat_memory.add_user_message(question)
+                messages.append(HumanMessage(content=question))
             if answer:
-                memory.chat_memory.add_ai_message(answer)
+                messages.append(AIMessage(content=answer))
+        memory.chat_memory.add_messages(messages)
 
         agent_type = args.get('agent_type', DEFAULT_AGENT_TYPE)
         agent_executor = initialize_agent(
@@ -210,62 +272,68 @@ AI: {response}'''
         # Prefer prediction time prompt template, if available.
         base_template = pred_args.get('prompt_template', args['prompt_template'])
 
-        input_variables = []
-        matches = list(re.finditer("{{(.*?)}}", base_template))
-
-        for m in matches:
-            input_variables.append(m[0].replace('{', '').replace('}', ''))
-        empty_prompt_ids = np.where(df[input_variables].isna().all(axis=1).values)[0]
+        if 'prompt_template' in pred_args or 'input_variables' not in args:
+            # Prediction time template, or model created before input variables were stored.
+            input_variables = _INPUT_VARIABLE_RE.findall(base_template)
+        else:
+            input_variables = args['input_variables']
+        prompts, empty_prompt_ids = prepare_prompts(df, base_template, input_variables, args.get('user_column', USER_COLUMN))
 
-        base_template = base_template.replace('{{', '{').replace('}}', '}')
-        prompts = []
+        # max_workers limits the number of agent invocations (and so LLM requests) in flight at once.
+        max_workers = args.get('max_workers', None) or _DEFAULT_MAX_CONCURRENT_AGENTS
+        agent_timeout_seconds = args.get('timeout', DEFAULT_AGENT_TIMEOUT_SECONDS)
+        timeout_message = "I'm sorry! I couldn't come up with a response in time. Please try again."
 
-        user_column = args.get('user_column', USER_COLUMN)
-        for i, row in df.iterrows():
-            if i not in empty_prompt_ids:
-                prompt = PromptTemplate(input_variables=input_variables, template=base_template)
-                kwargs = {}
-                for col in input_variables:
-                    kwargs[col] = row[col] if row[col] is not None else ''  # add empty quote if data is missing
-                prompts.append(prompt.format(**kwargs))
-            elif row.get(user_column):
-                # Just add prompt
-                prompts.append(row[user_column])
-
-        def _invoke_agent_executor_with_prompt(agent_executor, prompt):
+        async def _invoke_agent_executor_with_prompt(agent_executor, prompt, semaphore):
             if not prompt:
                 return ''
-            try:
-                answer = agent_executor.invoke(prompt)
-            except Exception as e:
-                answer = str(e)
-                if not answer.startswith("Could not parse LLM output: `"):
-                    raise e
-                answer = {'output': answer.removeprefix("Could not parse LLM output: `").removesuffix("`")}
-
-            if 'output' not in answer:
-                # This should never happen unless Langchain changes invoke output format, but just in case.
-                return agent_executor.run(prompt)
-            return answer['output']
-
-        completions = []
-        # max_workers defaults to number of processors on the machine multiplied by 5.
-        # https://docs.python.org/3/library/concurrent.futures.html#concurrent.futures.ThreadPoolExecutor
-        max_workers = args.get('max_workers', None)
-        agent_timeout_seconds = args.get('timeout', DEFAULT_AGENT_TIMEOUT_SECONDS)
-        executor = ContextThreadPoolExecutor(max_workers=max_workers)
-        futures = [executor.submit(_invoke_agent_executor_with_prompt, agent, prompt) for prompt in prompts]
-        try:
-            for future in as_completed(futures, timeout=agent_timeout_seconds):
-                completions.append(future.result())
-        except TimeoutError:
-            completions.append("I'm sorry! I couldn't come up with a response in time. Please try again.")
-        # Can't use ThreadPoolExecutor as context manager since we need wait=False.
-        executor.shutdown(wait=False)
+            async with semaphore:
+                try:
+                    answer = await agent_executor.ainvoke(prompt)
+                except Exception as e:
+                    answer = str(e)
+                    if not answer.startswith("Could not parse LLM output: `"):
+                        raise e
+                    answer = {'output': answer.removeprefix("Could not parse LLM output: `").removesuffix("`")}
+
+                if 'output' not in answer:
+                    # This should never happen unless Langchain changes invoke output format, but just in case.
+                    return await agent_executor.arun(prompt)
+                return answer['output']
+
+        async def _invoke_agent_executor_with_prompts():
+            # Semaphore has to be created inside the running loop.
+            semaphore = asyncio.Semaphore(max_workers)
+            tasks = [
+                asyncio.ensure_future(_invoke_agent_executor_with_prompt(agent, prompt, semaphore))
+                for prompt in prompts
+            ]
+            if not tasks:
+                return []
+            _, pending = await asyncio.wait(tasks, timeout=agent_timeout_seconds)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            # Results keep the order of the prompts.
+            return [timeout_message if task in pending else task.result() for task in tasks]
+
+        # The agents run in the context variables of the caller (e.g. the mindsdb context), as they did on a thread pool.
+        caller_context = contextvars.copy_context()
+
+        async def _invoke_agent_executor_with_prompts_in_caller_context():
+            # Tasks created from here on copy these values.
+            for var, value in caller_context.items():
+                var.set(value)
+            return await _invoke_agent_executor_with_prompts()
+
+        # All agents are awaited concurrently on the shared event loop instead of blocking a thread each on LLM I/O.
+        completions = asyncio.run_coroutine_threadsafe(
+            _invoke_agent_executor_with_prompts_in_caller_context(), _get_agent_loop()
+        ).result()
 
         # Add null completion for empty prompts
-        for i in sorted(empty_prompt_ids)[:-1]:
-            completions.insert(i, None)
+        completions = fill_empty_prompt_results(completions, empty_prompt_ids)
 
         pred_df = pd.DataFrame(completions, columns=[args['target']])
 
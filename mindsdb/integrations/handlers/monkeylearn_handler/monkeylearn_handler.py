@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Optional, Dict
 import pandas as pd
 import requests
@@ -9,6 +10,12 @@ from mindsdb.integrations.libs.base import BaseMLEngine
 from mindsdb.integrations.utilities.handler_utils import get_api_key
 
 
+@lru_cache(maxsize=8)
+def get_monkeylearn_client(api_key: str) -> MonkeyLearn:
+    # Clients are reused between calls, the handler itself is created anew for each one.
+    return MonkeyLearn(api_key)
+
+
 class monkeylearnHandler(BaseMLEngine):
     name = "monkeylearn"
 
@@ -53,23 +60,24 @@ class monkeylearnHandler(BaseMLEngine):
         input_list = df[input_column]
         if len(input_list) > 500:
             raise Exception("Classifier only supports 500 data elements in list")
-        ml = get_api_key('monkeylearn', args["using"], self.engine_storage, strict=False)
-        df_list = []
-        for text in input_list:
-            pred_dict = {}
-            classifier_response = ml.classifiers.classify(args['model_id'], [text])
-            for res_dict in classifier_response.body:
-                if res_dict.get("error") is True:
-                    raise Exception(res_dict["error_detail"])
-                pred_dict['classification'] = res_dict['classifications']
-                pred_dict['tag'] = res_dict['classifications'][0]['tag_name']
-                df_list.append(pd.DataFrame([pred_dict]))
-        pred_df = pd.concat(df_list)
+        ml = get_monkeylearn_client(get_api_key('monkeylearn', args, self.engine_storage, strict=False))
+        # All texts go in one call, the client splits them into API-sized batches itself.
+        classifier_response = ml.classifiers.classify(args['model_id'], input_list.tolist())
+        # Collect plain rows and build the DataFrame once, instead of a one-row DataFrame per response.
+        classifications = []
+        for res_dict in classifier_response.body:
+            if res_dict.get("error") is True:
+                raise Exception(res_dict["error_detail"])
+            classifications.append(res_dict['classifications'])
+        pred_df = pd.DataFrame({
+            'classification': classifications,
+            'tag': [classification[0]['tag_name'] for classification in classifications]
+        })
         return pred_df
 
     def describe(self, attribute: Optional[str] = None) -> pd.DataFrame:
         args = self.model_storage.json_get('args')
-        ml = get_api_key('monkeylearn', args["using"], self.engine_storage, strict=False)
+        ml = get_monkeylearn_client(get_api_key('monkeylearn', args, self.engine_storage, strict=False))
         response = ml.classifiers.detail(args['model_id'])
         description = {}
         description['name'] = response.body['name']
@@ -10,7 +10,6 @@ import concurrent.futures
 from typing import Text, Tuple, Dict, List, Optional, Any
 import openai
 from openai import OpenAI, NotFoundError, AuthenticationError
-import numpy as np
 import pandas as pd
 
 from mindsdb.utilities.hooks import before_openai_query, after_openai_query
@@ -28,7 +27,11 @@ from mindsdb.integrations.handlers.openai_handler.constants import (
     FINETUNING_MODELS,
     OPENAI_API_BASE,
 )
-from mindsdb.integrations.libs.llm.utils import get_completed_prompts
+from mindsdb.integrations.libs.llm.utils import (
+    get_completed_prompts,
+    get_empty_prompt_ids,
+    get_empty_prompt_id_set,
+)
 from mindsdb.integrations.utilities.handler_utils import get_api_key
 
 logger = log.getLogger(__name__)
@@ -148,26 +151,22 @@ class OpenAIHandler(BaseMLEngine):
             ['question_column', 'context_column'],
             ['prompt', 'user_column', 'assistant_column'],
         ]
-        for keys in keys_collection:
-            if keys[0] in args and any(
-                x[0] in args for x in keys_collection if x != keys
-            ):
-                raise Exception(
-                    textwrap.dedent(
-                        '''\
-                    Please provide one of
-                        1) a `prompt_template`
-                        2) a `question_column` and an optional `context_column`
-                        3) a `prompt', 'user_column' and 'assistant_column`
-                '''
-                    )
+        # the first key of each group selects a mode, so at most one of them can be given
+        if sum(keys[0] in args for keys in keys_collection) > 1:
+            raise Exception(
+                textwrap.dedent(
+                    '''\
+                Please provide one of
+                    1) a `prompt_template`
+                    2) a `question_column` and an optional `context_column`
+                    3) a `prompt', 'user_column' and 'assistant_column`
+            '''
                 )
+            )
 
         # for all args that are not expected, raise an error
-        known_args = set()
         # flatten of keys_collection
-        for keys in keys_collection:
-            known_args = known_args.union(set(keys))
+        known_args = set().union(*keys_collection)
 
         # TODO: need a systematic way to maintain a list of known args
         known_args = known_args.union(
@@ -299,10 +298,8 @@ class OpenAIHandler(BaseMLEngine):
             }
             model_name = 'embedding'
             if args.get('question_column'):
-                prompts = list(df[args['question_column']].apply(lambda x: str(x)))
-                empty_prompt_ids = np.where(
-                    df[[args['question_column']]].isna().all(axis=1).values
-                )[0]
+                prompts = df[args['question_column']].astype(str).tolist()
+                empty_prompt_ids = get_empty_prompt_ids(df, [args['question_column']])
             else:
                 raise Exception('Embedding mode needs a question_column')
 
@@ -319,10 +316,8 @@ class OpenAIHandler(BaseMLEngine):
             model_name = args.get('model_name', 'dall-e-2')
 
             if args.get('question_column'):
-                prompts = list(df[args['question_column']].apply(lambda x: str(x)))
-                empty_prompt_ids = np.where(
-                    df[[args['question_column']]].isna().all(axis=1).values
-                )[0]
+                prompts = df[args['question_column']].astype(str).tolist()
+                empty_prompt_ids = get_empty_prompt_ids(df, [args['question_column']])
             elif args.get('prompt_template'):
                 prompts, empty_prompt_ids = get_completed_prompts(base_template, df)
             else:
@@ -382,14 +377,9 @@ class OpenAIHandler(BaseMLEngine):
                 prompts, empty_prompt_ids = get_completed_prompts(base_template, df, strict=strict_prompt_template)
 
             elif args.get('context_column', False):
-                empty_prompt_ids = np.where(
-                    df[[args['context_column'], args['question_column']]]
-                    .isna()
-                    .all(axis=1)
-                    .values
-                )[0]
-                contexts = list(df[args['context_column']].apply(lambda x: str(x)))
-                questions = list(df[args['question_column']].apply(lambda x: str(x)))
+                empty_prompt_ids = get_empty_prompt_ids(df, [args['context_column'], args['question_column']])
+                contexts = df[args['context_column']].astype(str).tolist()
+                questions = df[args['question_column']].astype(str).tolist()
                 prompts = [
                     f'Context: {c}\nQuestion: {q}\nAnswer: '
                     for c, q in zip(contexts, questions)
@@ -399,28 +389,30 @@ class OpenAIHandler(BaseMLEngine):
                 empty_prompt_ids = []
                 prompts = list(df[args['user_column']])
             else:
-                empty_prompt_ids = np.where(
-                    df[[args['question_column']]].isna().all(axis=1).values
-                )[0]
-                prompts = list(df[args['question_column']].apply(lambda x: str(x)))
+                empty_prompt_ids = get_empty_prompt_ids(df, [args['question_column']])
+                prompts = df[args['question_column']].astype(str).tolist()
 
             # add json struct if available
             if args.get('json_struct', False):
+                empty_prompt_id_set = get_empty_prompt_id_set(empty_prompt_ids)
+                default_json_struct = ''.join(
+                    f'{ind + 1}. {val}\n' for ind, val in enumerate(args['json_struct'].values())
+                )
                 for i, prompt in enumerate(prompts):
                     json_struct = ''
-                    if 'json_struct' in df.columns and i not in empty_prompt_ids:
+                    if 'json_struct' in df.columns and i not in empty_prompt_id_set:
                         # if row has a specific json, we try to use it instead of the base prompt template
                         try:
                             if isinstance(df['json_struct'][i], str):
                                 df['json_struct'][i] = json.loads(df['json_struct'][i])
-                            for ind, val in enumerate(df['json_struct'][i].values()):
-                                json_struct = json_struct + f'{ind}. {val}\n'
+                            json_struct = ''.join(
+                                f'{ind}. {val}\n' for ind, val in enumerate(df['json_struct'][i].values())
+                            )
                         except Exception:
                             pass  # if the row's json is invalid, we use the prompt template instead
 
                     if json_struct == '':
-                        for ind, val in enumerate(args['json_struct'].values()):
-                            json_struct = json_struct + f'{ind + 1}. {val}\n'
+                        json_struct = default_json_struct
 
                     p = textwrap.dedent(
                         f'''\
@@ -452,7 +444,8 @@ class OpenAIHandler(BaseMLEngine):
                     prompts[i] = p
 
         # remove prompts without signal from completion queue
-        prompts = [j for i, j in enumerate(prompts) if i not in empty_prompt_ids]
+        empty_prompt_id_set = get_empty_prompt_id_set(empty_prompt_ids)
+        prompts = [j for i, j in enumerate(prompts) if i not in empty_prompt_id_set]
 
         api_key = get_api_key(self.api_key_name, args, self.engine_storage)
         api_args = {
@@ -8,7 +8,11 @@ import pandas as pd
 from mindsdb.utilities.hooks import before_palm_query, after_palm_query
 from mindsdb.utilities import log
 from mindsdb.integrations.libs.base import BaseMLEngine
-from mindsdb.integrations.libs.llm.utils import get_completed_prompts
+from mindsdb.integrations.libs.llm.utils import (
+    get_completed_prompts,
+    get_empty_prompt_ids,
+    get_empty_prompt_id_set,
+)
 
 from mindsdb.integrations.utilities.handler_utils import get_api_key
 
@@ -94,20 +98,18 @@ class PalmHandler(BaseMLEngine):
             ["question_column", "context_column"],
             ["prompt", "user_column", "assistant_column"],
         ]
-        for keys in keys_collection:
-            if keys[0] in args and any(
-                x[0] in args for x in keys_collection if x != keys
-            ):
-                raise Exception(
-                    textwrap.dedent(
-                        """\
-                    Please provide one of
-                        1) a `prompt_template`
-                        2) a `question_column` and an optional `context_column`
-                        3) a `prompt' and 'user_column' and 'assistant_column`
-                """
-                    )
+        # the first key of each group selects a mode, so at most one of them can be given
+        if sum(keys[0] in args for keys in keys_collection) > 1:
+            raise Exception(
+                textwrap.dedent(
+                    """\
+                Please provide one of
+                    1) a `prompt_template`
+                    2) a `question_column` and an optional `context_column`
+                    3) a `prompt' and 'user_column' and 'assistant_column`
+            """
                 )
+            )
 
     def create(self, target, args=None, **kwargs):
         args = args["using"]
@@ -169,10 +171,8 @@ class PalmHandler(BaseMLEngine):
             }
             model_name = "models/embedding-gecko-001"
             if args_model.question_column:
-                prompts = list(df[args_model.question_column].apply(lambda x: str(x)))
-                empty_prompt_ids = np.where(
-                    df[[args_model.question_column]].isna().all(axis=1).values
-                )[0]
+                prompts = df[args_model.question_column].astype(str).tolist()
+                empty_prompt_ids = get_empty_prompt_ids(df, [args_model.question_column])
             else:
                 raise Exception("Embedding mode needs a question_column")
 
@@ -226,14 +226,9 @@ class PalmHandler(BaseMLEngine):
                     raise Exception("No prompts found")
 
             elif args_model.context_column:
-                empty_prompt_ids = np.where(
-                    df[[args_model.context_column, args_model.question_column]]
-                    .isna()
-                    .all(axis=1)
-                    .values
-                )[0]
-                contexts = list(df[args_model.context_column].apply(lambda x: str(x)))
-                questions = list(df[args_model.question_column].apply(lambda x: str(x)))
+                empty_prompt_ids = get_empty_prompt_ids(df, [args_model.context_column, args_model.question_column])
+                contexts = df[args_model.context_column].astype(str).tolist()
+                questions = df[args_model.question_column].astype(str).tolist()
                 prompts = [
                     f"Context: {c}\nQuestion: {q}\nAnswer: "
                     for c, q in zip(contexts, questions)
@@ -246,13 +241,12 @@ class PalmHandler(BaseMLEngine):
                 if len(prompts) == 0:
                     raise Exception("No prompts found")
             else:
-                empty_prompt_ids = np.where(
-                    df[[args_model.question_column]].isna().all(axis=1).values
-                )[0]
-                prompts = list(df[args_model.question_column].apply(lambda x: str(x)))
+                empty_prompt_ids = get_empty_prompt_ids(df, [args_model.question_column])
+                prompts = df[args_model.question_column].astype(str).tolist()
 
         # remove prompts without signal from completion queue
-        prompts = [j for i, j in enumerate(prompts) if i not in empty_prompt_ids]
+        empty_prompt_id_set = get_empty_prompt_id_set(empty_prompt_ids)
+        prompts = [j for i, j in enumerate(prompts) if i not in empty_prompt_id_set]
 
         api_key = get_api_key("palm", args["using"], self.engine_storage, strict=False)
         api_args = {
@@ -2,13 +2,25 @@ import replicate
 import pandas as pd
 from mindsdb.integrations.libs.base import BaseMLEngine
 from typing import Dict, Optional
+from collections import deque
 import os
 import types
 from mindsdb.utilities.config import Config
+from mindsdb.utilities.context_executor import ContextThreadPoolExecutor
+
+# Upper bound on concurrent replicate.run calls in one predict.
+MAX_PREDICT_WORKERS = 32
+
+# Input schemas of model versions, keyed by (model_name, version). A published version never changes its schema.
+_schema_cache = {}
+# Parameter properties shown by DESCRIBE ... features.
+SCHEMA_PROPERTIES = ('default', 'description', 'type')
 
 
 class ReplicateHandler(BaseMLEngine):
     name = "replicate"
+    # API key resolved by _get_replicate_api_key, cached per handler instance.
+    _api_key = None
 
     @staticmethod
     def create_validation(target, args=None, **kwargs):
@@ -66,24 +78,21 @@ class ReplicateHandler(BaseMLEngine):
             # Run prediction using MindsDB's replicate library
             output = replicate.run(
                 f"{args['model_name']}:{args['version']}",
-                input={**conditions.to_dict(), **pred_args}         # Unpacking parameters inputted
+                input={**conditions, **pred_args}         # Unpacking parameters inputted
             ) 
             # Process output based on the model type
             if isinstance(output, types.GeneratorType) and args.get('model_type') == 'LLM':
-                output = ''.join(list(output))  # If model_type is LLM, make the stream a string
+                output = ''.join(output)  # If model_type is LLM, make the stream a string
             elif isinstance(output, types.GeneratorType):
-                output = list(output)[-1]  # Getting the final URL if output is a generator of frames URL
+                # Getting the final URL if output is a generator of frames URL, without keeping all the frames around
+                output = deque(output, maxlen=1).pop()
             elif isinstance(output, list) and len(output) > 0:
                 output = output[-1]  # Returns generated image for controlNet models as it outputs filter and generated image
             return output
 
         # Check if any wrong parameters are given and raise an exception if necessary
         params_names = set(df.columns) | set(pred_args)
-        available_params = self._get_schema(only_keys=True)
-        wrong_params = []
-        for i in params_names:
-            if i not in available_params:
-                wrong_params.append(i)
+        wrong_params = list(params_names - self._get_schema(only_keys=True))
 
         if wrong_params:
             raise Exception(f"""'{wrong_params}' is/are not supported parameter for this model.
@@ -93,12 +102,14 @@ Visit https://replicate.com/{model_name}/versions/{version} to check parameters.
         # Set the Replicate API token for communication with the server
         replicate.default_client.api_token = self._get_replicate_api_key(args)
 
-        # Run prediction on the DataFrame rows and format the results into a DataFrame
-        data = df.apply(get_data, axis=1)
-        data = pd.DataFrame(data)
-        data.columns = [target_col]
+        # Run prediction on the DataFrame rows concurrently, as each one is a network call, and format the results into a DataFrame
+        records = df.to_dict(orient='records')
+        if not records:
+            return pd.DataFrame(columns=[target_col])
+        with ContextThreadPoolExecutor(max_workers=min(MAX_PREDICT_WORKERS, len(records))) as executor:
+            outputs = list(executor.map(get_data, records))
 
-        return data
+        return pd.DataFrame({target_col: outputs})
 
     def describe(self, attribute: Optional[str] = None) -> pd.DataFrame:
 
@@ -116,22 +127,28 @@ Visit https://replicate.com/{model_name}/versions/{version} to check parameters.
             3. REPLICATE_API_KEY env variable
             4. replicate.api_key setting in config.json
         """  # noqa
+        if self._api_key is not None:
+            return self._api_key
         # 1
         if 'api_key' in args:
-            return args['api_key']
+            self._api_key = args['api_key']
+            return self._api_key
         # 2
         connection_args = self.engine_storage.get_connection_args()
         if 'api_key' in connection_args:
-            return connection_args['api_key']
+            self._api_key = connection_args['api_key']
+            return self._api_key
         # 3
         api_key = os.getenv('REPLICATE_API_TOKEN')
         if api_key is not None:
-            return api_key
+            self._api_key = api_key
+            return self._api_key
         # 4
         config = Config()
         replicate_cfg = config.get('replicate', {})
         if 'api_key' in replicate_cfg:
-            return replicate_cfg['api_key']
+            self._api_key = replicate_cfg['api_key']
+            return self._api_key
 
         if strict:
             raise Exception(f'Missing API key "api_key". Either re-create this ML_ENGINE specifying the `api_key` parameter,\
@@ -142,20 +159,25 @@ Visit https://replicate.com/{model_name}/versions/{version} to check parameters.
          which helps user to customize their prediction '''
 
         args = self.model_storage.json_get('args')
-        os.environ['REPLICATE_API_TOKEN'] = self._get_replicate_api_key(args)
-        replicate.default_client.api_token = self._get_replicate_api_key(args)
-        model = replicate.models.get(args['model_name'])
-        version = model.versions.get(args['version'])
-        schema = version.openapi_schema['components']['schemas']['Input']['properties']
+        cache_key = (args['model_name'], args['version'])
+        if cache_key not in _schema_cache:
+            api_key = self._get_replicate_api_key(args)
+            os.environ['REPLICATE_API_TOKEN'] = api_key
+            replicate.default_client.api_token = api_key
+            model = replicate.models.get(args['model_name'])
+            version = model.versions.get(args['version'])
+            _schema_cache[cache_key] = version.openapi_schema['components']['schemas']['Input']['properties']
+        schema = _schema_cache[cache_key]
 
         # returns only list of paramater
         if only_keys:
             return schema.keys()
 
-        for i in list(schema.keys()):
-            for j in list(schema[i].keys()):
-                if j not in ['default', 'description', 'type']:
-                    schema[i].pop(j)
+        # Keep only the relevant properties of each parameter, the cached schema itself is left untouched.
+        schema = {
+            name: {key: value for key, value in props.items() if key in SCHEMA_PROPERTIES}
+            for name, props in schema.items()
+        }
 
         df = pd.DataFrame(schema).T
         df = df.reset_index().rename(columns={'index': 'inputs'})
@@ -1,4 +1,5 @@
 import re
+import time
 import boto3
 import duckdb
 import pandas as pd
@@ -21,6 +22,16 @@ from mindsdb.integrations.libs.base import DatabaseHandler
 
 logger = log.getLogger(__name__)
 
+# Seconds for which an object found by head_object is assumed to still exist in the bucket.
+KEY_CHECK_TTL = 60
+
+
+def _quote_literal(value: Text) -> Text:
+    """
+    Quotes a value as a SQL string literal. DuckDB's SET statements do not accept prepared statement parameters.
+    """
+    return "'" + str(value).replace("'", "''") + "'"
+
 
 class S3Handler(DatabaseHandler):
     """
@@ -50,6 +61,9 @@ class S3Handler(DatabaseHandler):
         self.connection = None
         self.is_connected = False
         self.thread_safe = True
+        self._boto3_client = None
+        # (bucket, key) -> time.monotonic() of the last successful head_object call.
+        self._verified_keys = {}
 
     def __del__(self):
         if self.is_connected is True:
@@ -90,27 +104,42 @@ class S3Handler(DatabaseHandler):
         duckdb_conn = duckdb.connect()
         duckdb_conn.execute("INSTALL httpfs")
         duckdb_conn.execute("LOAD httpfs")
+        # Cache HTTP metadata (e.g. object sizes from HEAD requests) between the reads of a file.
+        duckdb_conn.execute("SET enable_http_metadata_cache=true")
+        # Cache parsed Parquet metadata, so repeated reads of the same object skip the footer.
+        duckdb_conn.execute("SET enable_object_cache=true")
 
         # Configure mandatory credentials.
-        duckdb_conn.execute(f"SET s3_access_key_id='{self.connection_data['aws_access_key_id']}'")
-        duckdb_conn.execute(f"SET s3_secret_access_key='{self.connection_data['aws_secret_access_key']}'")
+        settings = {
+            's3_access_key_id': self.connection_data['aws_access_key_id'],
+            's3_secret_access_key': self.connection_data['aws_secret_access_key']
+        }
 
         # Configure optional parameters.
         if 'aws_session_token' in self.connection_data:
-            duckdb_conn.execute(f"SET s3_session_token='{self.connection_data['aws_session_token']}'")
+            settings['s3_session_token'] = self.connection_data['aws_session_token']
 
         if 'region_name' in self.connection_data:
-            duckdb_conn.execute(f"SET s3_region='{self.connection_data['region_name']}'")
+            settings['s3_region'] = self.connection_data['region_name']
+
+        # Apply all the settings in a single call.
+        duckdb_conn.execute('; '.join(
+            f"SET {setting}={_quote_literal(value)}" for setting, value in settings.items()
+        ))
 
         return duckdb_conn
 
     def _connect_boto3(self) -> boto3.client:
         """
         Establishes a connection to the AWS (S3) account via boto3.
+        The client is created once and reused for the lifetime of the handler.
 
         Returns:
             boto3.client: A client object to the AWS (S3) account.
         """
+        if self._boto3_client is not None:
+            return self._boto3_client
+
         # Configure mandatory credentials.
         config = {
             'aws_access_key_id': self.connection_data['aws_access_key_id'],
@@ -124,7 +153,8 @@ class S3Handler(DatabaseHandler):
         # DuckDB considers us-east-1 to be the default region.
         config['region_name'] = self.connection_data['region_name'] if 'region_name' in self.connection_data else 'us-east-1'
 
-        return boto3.client('s3', **config)
+        self._boto3_client = boto3.client('s3', **config)
+        return self._boto3_client
 
     def disconnect(self):
         """
@@ -189,13 +219,10 @@ class S3Handler(DatabaseHandler):
 
             cursor.execute(query)
             if self.is_select_query:
-                result = cursor.fetchall()
+                # Fetch straight into a DataFrame, without going through a list of Python tuples.
                 response = Response(
                     RESPONSE_TYPE.TABLE,
-                    data_frame=pd.DataFrame(
-                        result,
-                        columns=[x[0] for x in cursor.description]
-                    )
+                    data_frame=cursor.fetchdf()
                 )
 
             else:
@@ -219,12 +246,25 @@ class S3Handler(DatabaseHandler):
         """
         Creates a table from a file in the S3 bucket.
 
+        SELECT queries get a view over the file, so that DuckDB only fetches the columns and rows it needs.
+        Other queries modify the data, so they get a table that is written back to the file afterwards.
+
         Raises:
             CatalogException: If the file does not exist in the S3 bucket.
         """
         connection = self.connect()
+        source = f"SELECT * FROM 's3://{self.connection_data['bucket']}/{self.key}'"
         try:
-            connection.execute(f"CREATE TABLE IF NOT EXISTS {self.table_name} AS SELECT * FROM 's3://{self.connection_data['bucket']}/{self.key}'")
+            if self.is_select_query:
+                # If the table was already materialized on this connection, it is used as is.
+                connection.execute(f"CREATE VIEW IF NOT EXISTS {self.table_name} AS {source}")
+            else:
+                is_view = connection.execute(
+                    "SELECT 1 FROM duckdb_views() WHERE view_name = ?", [self.table_name]
+                ).fetchone() is not None
+                if is_view:
+                    connection.execute(f"DROP VIEW {self.table_name}")
+                connection.execute(f"CREATE TABLE IF NOT EXISTS {self.table_name} AS {source}")
         except CatalogException as e:
             logger.error(f'Error creating table {self.table_name} from file {self.key} in {self.connection_data["bucket"]}, {e}!')
             raise e
@@ -258,8 +298,8 @@ class S3Handler(DatabaseHandler):
         """
         # Set the key by getting it from the query.
         # This will be used to create a table from the object in the S3 bucket.
-        if isinstance(query, Select):
-            self.is_select_query = True
+        self.is_select_query = isinstance(query, Select)
+        if self.is_select_query:
             table = query.from_table
 
         else:
@@ -272,13 +312,18 @@ class S3Handler(DatabaseHandler):
             logger.error(f'The file format {self.key.split(".")[-1]} is not supported!')
             raise ValueError(f'The file format {self.key.split(".")[-1]} is not supported!')
 
-        # Check if the file exists in the S3 bucket.
-        try:
-            boto3_conn = self._connect_boto3()
-            boto3_conn.head_object(Bucket=self.connection_data['bucket'], Key=self.key)
-        except ClientError as e:
-            logger.error(f'Error querying the file {self.key} in the bucket {self.connection_data["bucket"]}, {e}!')
-            raise e
+        # Check if the file exists in the S3 bucket, unless it was checked recently.
+        key_cache_key = (self.connection_data['bucket'], self.key)
+        verified_at = self._verified_keys.get(key_cache_key)
+        if verified_at is None or time.monotonic() - verified_at >= KEY_CHECK_TTL:
+            try:
+                boto3_conn = self._connect_boto3()
+                boto3_conn.head_object(Bucket=self.connection_data['bucket'], Key=self.key)
+            except ClientError as e:
+                self._verified_keys.pop(key_cache_key, None)
+                logger.error(f'Error querying the file {self.key} in the bucket {self.connection_data["bucket"]}, {e}!')
+                raise e
+            self._verified_keys[key_cache_key] = time.monotonic()
 
         # Replace all special characters in the key with underscores to create a valid table name.
         self.table_name = re.sub(r'[\W]+', '_', self.key)
@@ -296,7 +341,11 @@ class S3Handler(DatabaseHandler):
                 alias=table.alias
             )
 
-        return self.native_query(query.to_string())
+        response = self.native_query(query.to_string())
+        if response.type == RESPONSE_TYPE.ERROR:
+            # The object may have been removed since it was checked, so check it again on the next query.
+            self._verified_keys.pop(key_cache_key, None)
+        return response
 
     def get_tables(self) -> Response:
         """
@@ -308,11 +357,18 @@ class S3Handler(DatabaseHandler):
             Response: A response object containing the list of tables and views, formatted as per the `Response` class.
         """
         boto3_conn = self._connect_boto3()
-        objects = boto3_conn.list_objects_v2(Bucket=self.connection_data["bucket"])['Contents']
+        # A single list_objects_v2 call returns at most 1000 keys, so go through all the pages.
+        paginator = boto3_conn.get_paginator('list_objects_v2')
+        pages = paginator.paginate(Bucket=self.connection_data["bucket"])
 
         # Get only the supported file formats.
         # Sorround the object names with backticks to prevent SQL syntax errors.
-        supported_objects = [f"`{obj['Key']}`" for obj in objects if obj['Key'].split('.')[-1] in self.supported_file_formats]
+        supported_objects = [
+            f"`{obj['Key']}`"
+            for page in pages
+            for obj in page.get('Contents', [])
+            if obj['Key'].split('.')[-1] in self.supported_file_formats
+        ]
 
         response = Response(
             RESPONSE_TYPE.TABLE,
@@ -340,17 +396,25 @@ class S3Handler(DatabaseHandler):
         if not table_name or not isinstance(table_name, str):
             raise ValueError("Invalid table name provided.")
 
-        # TODO: Is there a more efficient way to get the column details?
-        # If not, can it be limited to one column?
-        query = f"SELECT * FROM {table_name} LIMIT 5"
-        result = self.native_query(query)
+        # Table names are object keys, possibly surrounded by backticks (see `get_tables`).
+        key = table_name.replace('`', '')
+        need_to_close = not self.is_connected
+        connection = self.connect()
+
+        # DESCRIBE only reads the schema (e.g. the parquet footer or the CSV header sample), not the whole object.
+        path = f"s3://{self.connection_data['bucket']}/{key}"
+        try:
+            schema = connection.execute(f"DESCRIBE SELECT * FROM {_quote_literal(path)}").fetchdf()
+        finally:
+            if need_to_close is True:
+                self.disconnect()
 
         response = Response(
             RESPONSE_TYPE.TABLE,
             data_frame=pd.DataFrame(
                 {
-                    'column_name': result.data_frame.columns,
-                    'data_type': [data_type if data_type != 'object' else 'string' for data_type in result.data_frame.dtypes]
+                    'column_name': schema['column_name'],
+                    'data_type': schema['column_type']
                 }
             )
         )
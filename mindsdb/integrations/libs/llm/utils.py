@@ -1,7 +1,8 @@
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, List, Set, Tuple
 import json
 import itertools
 import re
+from functools import lru_cache
 
 import numpy as np
 import pandas as pd
@@ -44,6 +45,69 @@ DEFAULT_NVIDIA_NIM_BASE_URL = (
 )
 DEFAULT_NVIDIA_NIM_MODEL = "meta/llama-3_1-8b-instruct"
 
+# Matches `{{column_name}}` placeholders in prompt templates.
+_PLACEHOLDER_RE = re.compile(r"{{(.*?)}}")
+
+
+@lru_cache(maxsize=128)
+def _parse_template(base_template: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Splits a prompt template into the text around its `{{column_name}}` placeholders and the placeholder names.
+    Templates are usually reused across predict calls, so the result is cached.
+
+    :return template: text atoms, one more than there are placeholders
+    :return columns: placeholder names, in order of appearance
+    """
+    columns = []
+    spans = []
+    matches = list(_PLACEHOLDER_RE.finditer(base_template))
+
+    if len(matches) == 0:
+        return (base_template,), ()
+
+    first_span = matches[0].start()
+    last_span = matches[-1].end()
+
+    for m in matches:
+        columns.append(m.group(1))
+        spans.extend((m.start(), m.end()))
+
+    spans = spans[1:-1]  # omit first and last, they are added separately
+    template = [
+        base_template[s:e] for s, e in list(zip(spans, spans[1:]))[::2]
+    ]  # take every other to skip placeholders  # noqa
+    template.insert(0, base_template[0:first_span])  # add prompt start
+    template.append(base_template[last_span:])  # add prompt end
+
+    return tuple(template), tuple(columns)
+
+
+def get_empty_prompt_ids(df: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    """
+    Helper method that returns the positions of the rows where all of the given columns are missing.
+
+    :param df: pd.DataFrame with the prompt data
+    :param columns: columns that are used to build each prompt
+
+    :return: np.int numpy array with the row positions that have no data to build a prompt with.
+    """
+    if len(columns) == 1:
+        # avoid the row-wise reduction over a single column
+        return df[columns[0]].isna().to_numpy().nonzero()[0]
+    return df[columns].isna().all(axis=1).to_numpy().nonzero()[0]
+
+
+def get_empty_prompt_id_set(empty_prompt_ids) -> Set[int]:
+    """
+    Helper method that turns the ids returned by `get_empty_prompt_ids` or `get_completed_prompts` into a set,
+    so that checking whether a prompt position is empty is O(1).
+
+    :param empty_prompt_ids: numpy array or list with the row positions that have no data to build a prompt with.
+
+    :return: set of python ints with the same row positions.
+    """
+    return set(np.asarray(empty_prompt_ids).tolist())
+
 
 def get_completed_prompts(
     base_template: str, df: pd.DataFrame, strict=True
@@ -59,11 +123,9 @@ def get_completed_prompts(
     :return prompts: list of in-filled prompts using `base_template` and relevant columns from `df`
     :return empty_prompt_ids: np.int numpy array (shape (n_missing_rows,)) with the row indexes where in-fill failed due to missing data.
     """  # noqa
-    columns = []
-    spans = []
-    matches = list(re.finditer("{{(.*?)}}", base_template))
+    template, columns = _parse_template(base_template)
 
-    if len(matches) == 0:
+    if len(columns) == 0:
         # no placeholders
         if strict:
             raise AssertionError(
@@ -72,37 +134,17 @@ def get_completed_prompts(
         prompts = [base_template] * len(df)
         return prompts, np.ndarray(0)
 
-    first_span = matches[0].start()
-    last_span = matches[-1].end()
-
-    for m in matches:
-        columns.append(m[0].replace("{", "").replace("}", ""))
-        spans.extend((m.start(), m.end()))
-
-    spans = spans[1:-1]  # omit first and last, they are added separately
-    template = [
-        base_template[s:e] for s, e in list(zip(spans, spans[1:]))[::2]
-    ]  # take every other to skip placeholders  # noqa
-    template.insert(0, base_template[0:first_span])  # add prompt start
-    template.append(base_template[last_span:])  # add prompt end
+    empty_prompt_ids = get_empty_prompt_ids(df, list(columns))
 
-    empty_prompt_ids = np.where(df[columns].isna().all(axis=1).values)[0]
-
-    df["__mdb_prompt"] = ""
-    for i in range(len(template)):
-        atom = template[i]
-        if i < len(columns):
-            col = df[columns[i]].replace(
-                to_replace=[None], value=""
-            )  # add empty quote if data is missing
-            df["__mdb_prompt"] = df["__mdb_prompt"].apply(
-                lambda x: x + atom
-            ) + col.astype("string")
-        else:
-            df["__mdb_prompt"] = df["__mdb_prompt"].apply(lambda x: x + atom)
-    prompts = list(df["__mdb_prompt"])
+    # Whole columns are concatenated at once; the input DataFrame is left untouched.
+    prompts = pd.Series(template[0], index=df.index, dtype="string")
+    for column, atom in zip(columns, template[1:]):
+        col = df[column].replace(
+            to_replace=[None], value=""
+        )  # add empty quote if data is missing
+        prompts = prompts + col.astype("string") + atom
 
-    return prompts, empty_prompt_ids
+    return prompts.tolist(), empty_prompt_ids
 
 
 def get_llm_config(provider: str, config: Dict) -> BaseLLMConfig:
@@ -249,22 +291,22 @@ def ft_jsonl_validation(
     :return: None, raises an Exception if validation fails.
     """  # noqa
     try:
-        if not all([isinstance(m, dict) for m in items]):
+        if not all(isinstance(m, dict) for m in items):
             raise Exception("Each line in the provided data should be a dictionary")
 
         for line_num, batch in enumerate(items):
             prefix = f"error in chat #{line_num + 1}, "
 
-            if not isinstance(batch[messages_col], list):
-                raise Exception(
-                    f"{prefix}Each line in the provided data should have a '{messages_col}' key with a list of messages"
-                )  # noqa
-
             if messages_col not in batch:
                 raise Exception(
                     f"{prefix}Each line in the provided data should have a '{messages_col}' key"
                 )
 
+            if not isinstance(batch[messages_col], list):
+                raise Exception(
+                    f"{prefix}Each line in the provided data should have a '{messages_col}' key with a list of messages"
+                )  # noqa
+
             messages = batch[messages_col]
             try:
                 ft_chat_format_validation(
@@ -319,33 +361,9 @@ def ft_chat_format_validation(
     valid_keys = (role_key, content_key, name_key)
     valid_roles = (system_key, user_key, assistant_key)
 
-    for c in chat:
-        if any(k not in valid_keys for k in c.keys()):
-            raise Exception(
-                f"Each message should only have these keys: `{valid_keys}`. Found: `{c.keys()}`"
-            )
-
-    roles = [m[role_key] for m in chat]
-    contents = [m[content_key] for m in chat]
-
-    if len(roles) != len(contents):
-        raise Exception(
-            f"Each message should contain both `{role_key}` and `{content_key}` fields"
-        )
-
-    if len(roles) == 0:
+    if len(chat) == 0:
         raise Exception("Chat should have at least one message")
 
-    if assistant_key not in roles:
-        raise Exception(
-            "Chat should have at least one assistant message"
-        )  # otherwise it is useless for FT
-
-    if user_key not in roles:
-        raise Exception(
-            "Chat should have at least one user message"
-        )  # perhaps remove in the future
-
     # set default transitions for finite state machine if undefined
     if transitions is None:
         transitions = {
@@ -355,12 +373,25 @@ def ft_chat_format_validation(
             assistant_key: [user_key],
         }
 
-    # check order is valid via finite state machine
+    # check each message and that the order is valid via finite state machine, in a single pass
     state = None
-    for i, (role, content) in enumerate(zip(roles, contents)):
+    seen_user = seen_assistant = False
+    for i, message in enumerate(chat):
 
         prefix = f"message #{i + 1}: "
 
+        if any(k not in valid_keys for k in message.keys()):
+            raise Exception(
+                f"Each message should only have these keys: `{valid_keys}`. Found: `{message.keys()}`"
+            )
+
+        if role_key not in message or content_key not in message:
+            raise Exception(
+                f"Each message should contain both `{role_key}` and `{content_key}` fields"
+            )
+        role = message[role_key]
+        content = message[content_key]
+
         # check invalid roles
         if role not in valid_roles:
             raise Exception(
@@ -379,6 +410,19 @@ def ft_chat_format_validation(
         else:
             state = role
 
+        seen_user = seen_user or role == user_key
+        seen_assistant = seen_assistant or role == assistant_key
+
+    if not seen_assistant:
+        raise Exception(
+            "Chat should have at least one assistant message"
+        )  # otherwise it is useless for FT
+
+    if not seen_user:
+        raise Exception(
+            "Chat should have at least one user message"
+        )  # perhaps remove in the future
+
 
 def ft_formatter(df: pd.DataFrame) -> List[Dict]:
     """
@@ -445,9 +489,9 @@ def ft_chat_formatter(df: pd.DataFrame) -> List[Dict]:
 
     # 2a. chats are in JSON format
     if "chat_json" in df.columns:
-        for _, row in df.iterrows():
+        for chat_json in df["chat_json"].to_numpy():
             try:
-                chat = json.loads(row["chat_json"])
+                chat = json.loads(chat_json)
                 assert list(chat.keys()) == [
                     "messages"
                 ], "Each chat should have a 'messages' key, and nothing else."
@@ -461,14 +505,14 @@ def ft_chat_formatter(df: pd.DataFrame) -> List[Dict]:
     # 2b. chats are in tabular format - aggregate each chat sequence into one row
     else:
         chat = []
-        for i, row in df.iterrows():
-            if row["role"] == "system" and len(chat) > 0:
+        for role, content in zip(df["role"].to_numpy(), df["content"].to_numpy()):
+            if role == "system" and len(chat) > 0:
                 ft_chat_format_validation(
                     chat
                 )  # will raise Exception if chat is invalid
                 chats.append({"messages": chat})
                 chat = []
-            event = {"role": row["role"], "content": row["content"]}
+            event = {"role": role, "content": content}
             chat.append(event)
 
         ft_chat_format_validation(chat)  # will raise Exception if chat is invalid
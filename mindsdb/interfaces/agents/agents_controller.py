@@ -1,4 +1,7 @@
 import datetime
+import threading
+import time
+from copy import deepcopy
 from typing import Dict, Iterator, List, Union
 
 from langchain_core.tools import BaseTool
@@ -17,12 +20,20 @@ from mindsdb.utilities.context import context as ctx
 from .constants import ASSISTANT_COLUMN, SUPPORTED_PROVIDERS, PROVIDER_TO_MODELS
 from .langchain_agent import get_llm_provider
 
+# Models used by agents rarely change, so lookups are cached for a short time to save DB queries per completion.
+MODEL_CACHE_TTL_SECONDS = 60
+MODEL_CACHE_MAX_SIZE = 512
+
 
 class AgentsController:
     '''Handles CRUD operations at the database level for Agents'''
 
     assistant_column = ASSISTANT_COLUMN
 
+    # (company_id, model_name) -> {'model': dict, 'models_version': int, 'expired_at': float}, shared between controller instances.
+    _model_cache = {}
+    _model_cache_lock = threading.Lock()
+
     def __init__(
         self,
         project_controller: ProjectController = None,
@@ -56,8 +67,7 @@ class AgentsController:
         model = None
 
         try:
-            model_name_no_version, model_version = Predictor.get_name_and_version(model_name)
-            model = self.model_controller.get_model(model_name_no_version, version=model_version)
+            model = self._get_model(model_name)
             provider = 'mindsdb' if model.get('provider') is None else model.get('provider')
         except PredictorRecordNotFound:
             if not provider:
@@ -69,6 +79,49 @@ class AgentsController:
 
         return model, provider
 
+    def _get_model(self, model_name: str) -> dict:
+        '''
+        Gets a model by name (with optional version), using a short-lived cache.
+        The cache is dropped when models are created, changed or deleted by this process (see ModelController.models_version).
+
+        Parameters:
+            model_name (str): The name of the model
+
+        Returns:
+            model (dict): The model object
+
+        Raises:
+            PredictorRecordNotFound: Model does not exist.
+        '''
+        key = (ctx.company_id, model_name)
+        models_version = ModelController.models_version
+        with self._model_cache_lock:
+            record = self._model_cache.get(key)
+        if record is not None and record['models_version'] == models_version and record['expired_at'] > time.time():
+            # Callers get their own copy, so the cached model can't be changed through them.
+            return deepcopy(record['model'])
+
+        model_name_no_version, model_version = Predictor.get_name_and_version(model_name)
+        model = self.model_controller.get_model(model_name_no_version, version=model_version)
+
+        # The cache is shared by all request threads.
+        with self._model_cache_lock:
+            if len(self._model_cache) >= MODEL_CACHE_MAX_SIZE:
+                now = time.time()
+                for stale_key in [
+                    k for k, v in self._model_cache.items()
+                    if v['expired_at'] <= now or v['models_version'] != models_version
+                ]:
+                    self._model_cache.pop(stale_key, None)
+                if len(self._model_cache) >= MODEL_CACHE_MAX_SIZE:
+                    self._model_cache.clear()
+            self._model_cache[key] = {
+                'model': model,
+                'models_version': models_version,
+                'expired_at': time.time() + MODEL_CACHE_TTL_SECONDS
+            }
+        return deepcopy(model)
+
     def get_agent(self, agent_name: str, project_name: str = 'mindsdb') -> db.Agents:
         '''
         Gets an agent by name.
@@ -141,7 +194,8 @@ class AgentsController:
             model_name: str,
             skills: List[str],
             provider: str = None,
-            params: Dict[str, str] = {}) -> db.Agents:
+            params: Dict[str, str] = {},
+            commit: bool = True) -> db.Agents:
         '''
         Adds an agent to the database.
 
@@ -152,6 +206,7 @@ class AgentsController:
             skills (List[str]): List of existing skill names to add to the new agent
             provider (str): The provider of the model
             params (Dict[str, str]): Parameters to use when running the agent
+            commit (bool): Whether to commit the session. Set to False to add several agents in one transaction
 
         Returns:
             agent (db.Agents): The created agent
@@ -189,7 +244,8 @@ class AgentsController:
         agent.skills = skills_to_add
 
         db.session.add(agent)
-        db.session.commit()
+        if commit:
+            db.session.commit()
 
         return agent
 
@@ -295,7 +351,8 @@ class AgentsController:
             messages: List[Dict[str, str]],
             project_name: str = 'mindsdb',
             tools: List[BaseTool] = None,
-            stream: bool = False) -> Union[Iterator[object], pd.DataFrame]:
+            stream: bool = False,
+            params: Dict = None) -> Union[Iterator[object], pd.DataFrame]:
         '''
         Queries an agent to get a completion.
 
@@ -307,6 +364,7 @@ class AgentsController:
             project_name (str): Project the agent belongs to (default mindsdb)
             tools (List[BaseTool]): Tools to use while getting the completion
             stream (bool): Whether or not to stream the response
+            params (Dict): Parameters to run the agent with instead of the stored agent params
 
         Returns:
             response (Union[Iterator[object], pd.DataFrame]): Completion as a DataFrame or iterator of completion chunks
@@ -319,7 +377,8 @@ class AgentsController:
                 agent,
                 messages,
                 project_name=project_name,
-                tools=tools
+                tools=tools,
+                params=params
             )
         from .langchain_agent import LangchainAgent
 
@@ -329,7 +388,7 @@ class AgentsController:
             agent.provider = provider
             db.session.commit()
 
-        lang_agent = LangchainAgent(agent, model)
+        lang_agent = LangchainAgent(agent, model, params=params)
         return lang_agent.get_completion(messages)
 
     def _get_completion_stream(
@@ -337,7 +396,8 @@ class AgentsController:
             agent: db.Agents,
             messages: List[Dict[str, str]],
             project_name: str = 'mindsdb',
-            tools: List[BaseTool] = None) -> Iterator[object]:
+            tools: List[BaseTool] = None,
+            params: Dict = None) -> Iterator[object]:
         '''
         Queries an agent to get a stream of completion chunks.
 
@@ -348,6 +408,7 @@ class AgentsController:
             observation_id (str): ID of parent Langfuse observation to use
             project_name (str): Project the agent belongs to (default mindsdb)
             tools (List[BaseTool]): Tools to use while getting the completion
+            params (Dict): Parameters to run the agent with instead of the stored agent params
 
         Returns:
             chunks (Iterator[object]): Completion chunks as an iterator
@@ -365,5 +426,5 @@ class AgentsController:
             agent.provider = provider
             db.session.commit()
 
-        lang_agent = LangchainAgent(agent, model=model)
+        lang_agent = LangchainAgent(agent, model=model, params=params)
         return lang_agent.get_completion(messages, stream=True)
@@ -1,9 +1,12 @@
+import atexit
 import json
-from concurrent.futures import as_completed, TimeoutError
+from concurrent.futures import as_completed, ThreadPoolExecutor, TimeoutError
+from functools import lru_cache
 from typing import Dict, Iterable, List
 from uuid import uuid4
 import os
 import re
+import threading
 import numpy as np
 import pandas as pd
 
@@ -19,7 +22,6 @@ from langchain_community.chat_models import (
     ChatOllama,
 )
 from langchain_nvidia_ai_endpoints import ChatNVIDIA
-from langchain_core.prompts import PromptTemplate
 from langchain_core.tools import Tool
 from langfuse import Langfuse
 from langfuse.callback import CallbackHandler
@@ -60,13 +62,59 @@ from .constants import (
 from ..skills.skill_tool import skill_tool, SkillType
 from ...integrations.utilities.rag.settings import DEFAULT_RAG_PROMPT_TEMPLATE
 
-_PARSING_ERROR_PREFIXES = [
+# Tuple, so it can be passed to str.startswith directly.
+_PARSING_ERROR_PREFIXES = (
     "An output parsing error occurred",
     "Could not parse LLM output",
-]
+)
+_INPUT_VARIABLE_RE = re.compile(r"{{(.*?)}}")
+_TEMPLATE_ESCAPE_RE = re.compile(r"{{|}}")
 
 logger = log.getLogger(__name__)
 
+# Environment is read once at import: these values don't change during the process lifetime.
+_LANGFUSE_PUBLIC_KEY = os.getenv('LANGFUSE_PUBLIC_KEY')
+_LANGFUSE_SECRET_KEY = os.getenv('LANGFUSE_SECRET_KEY')
+_LANGFUSE_HOST = os.getenv('LANGFUSE_HOST')
+_LANGFUSE_ENABLED = _LANGFUSE_PUBLIC_KEY is not None
+
+# Tool usage of langfuse traces is filled in by one background worker, so slow flushes don't pile up threads.
+_tool_usage_executor = None
+_tool_usage_executor_pid = None
+_tool_usage_executor_lock = threading.Lock()
+
+
+def _get_tool_usage_executor() -> ThreadPoolExecutor:
+    """
+    Returns the single worker executor for tool usage updates, starting it on first use in this process.
+    """
+    global _tool_usage_executor, _tool_usage_executor_pid
+    with _tool_usage_executor_lock:
+        # A forked process inherits the executor, but not its worker thread.
+        if _tool_usage_executor is None or _tool_usage_executor_pid != os.getpid():
+            _tool_usage_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='langfuse-tool-usage')
+            _tool_usage_executor_pid = os.getpid()
+        return _tool_usage_executor
+
+
+@atexit.register
+def _flush_tool_usage_updates():
+    """
+    Waits for the pending tool usage updates, so they are not lost on shutdown.
+    """
+    global _tool_usage_executor
+    with _tool_usage_executor_lock:
+        executor = _tool_usage_executor if _tool_usage_executor_pid == os.getpid() else None
+        _tool_usage_executor = None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+@lru_cache(maxsize=4)
+def get_langfuse_client(public_key: str, secret_key: str, host: str) -> Langfuse:
+    """Returns a Langfuse client shared by all agents using the same credentials."""
+    return Langfuse(public_key=public_key, secret_key=secret_key, host=host)
+
 
 def get_llm_provider(args: Dict) -> str:
     if "provider" in args:
@@ -107,13 +155,16 @@ def get_chat_model_params(args: Dict) -> Dict:
     return config_dict
 
 
-def create_chat_model(args: Dict):
-    model_kwargs = get_chat_model_params(args)
+@lru_cache(maxsize=32)
+def _get_tiktoken_model_name(model: str) -> str:
+    if model.startswith("gpt-4"):
+        return "gpt-4"
+    return model
 
-    def _get_tiktoken_model_name(model: str) -> str:
-        if model.startswith("gpt-4"):
-            return "gpt-4"
-        return model
+
+def create_chat_model(args: Dict, model_kwargs: Dict = None):
+    # Callers that already computed the model params can pass them in to avoid building them twice.
+    model_kwargs = get_chat_model_params(args) if model_kwargs is None else dict(model_kwargs)
 
     if args["provider"] == "anthropic":
         return ChatAnthropic(**model_kwargs)
@@ -137,22 +188,43 @@ def create_chat_model(args: Dict):
     raise ValueError(f'Unknown provider: {args["provider"]}')
 
 
+@lru_cache(maxsize=64)
+def _normalize_template(template: str) -> str:
+    """Turns `{{var}}` placeholders into `str.format` fields in a single pass."""
+    return _TEMPLATE_ESCAPE_RE.sub(lambda m: m.group()[0], template)
+
+
 def prepare_prompts(df, base_template, input_variables, user_column=USER_COLUMN):
-    empty_prompt_ids = np.where(df[input_variables].isna().all(axis=1).values)[0]
-    base_template = base_template.replace('{{', '{').replace('}}', '}')
+    # Ids are row positions, not index labels: fill_empty_prompt_results puts the empty results back at these positions.
+    # A set, since it is probed once per row below.
+    empty_prompt_mask = df[input_variables].isna().to_numpy(dtype=bool, copy=False).all(axis=1)
+    empty_prompt_ids = set(np.flatnonzero(empty_prompt_mask).tolist())
+    base_template = _normalize_template(base_template)
     prompts = []
 
-    for i, row in df.iterrows():
+    # Read the columns once instead of building a Series per row; only None is formatted as an empty string.
+    columns = {col: df[col].tolist() for col in input_variables}
+    user_inputs = df[user_column].tolist() if user_column in df.columns else [None] * len(df)
+    for i, user_input in enumerate(user_inputs):
         if i not in empty_prompt_ids:
-            prompt = PromptTemplate(input_variables=input_variables, template=base_template)
-            kwargs = {col: row[col] if row[col] is not None else '' for col in input_variables}
-            prompts.append(prompt.format(**kwargs))
-        elif row.get(user_column):
-            prompts.append(row[user_column])
+            kwargs = {col: '' if values[i] is None else values[i] for col, values in columns.items()}
+            prompts.append(base_template.format_map(kwargs))
+        elif user_input:
+            prompts.append(user_input)
 
     return prompts, empty_prompt_ids
 
 
+def fill_empty_prompt_results(results, empty_prompt_ids, fill_value=None):
+    """Places `fill_value` at every empty prompt position (except the last one) in a single pass over the results."""
+    fill_ids = set(sorted(empty_prompt_ids)[:-1])
+    results_iter = iter(results)
+    return [
+        fill_value if i in fill_ids else next(results_iter)
+        for i in range(len(results) + len(fill_ids))
+    ]
+
+
 def prepare_callbacks(self, args):
     context_callback = ContextCaptureCallback()
     callbacks = self._get_agent_callbacks(args)
@@ -178,12 +250,13 @@ def process_chunk(chunk):
 
 
 class LangchainAgent:
-    def __init__(self, agent: db.Agents, model):
+    def __init__(self, agent: db.Agents, model, params: Dict = None):
 
         self.llm = None
         self.embedding_model = None
         self.agent = agent
-        args = agent.params.copy()
+        # Params given by the caller are used instead of the stored ones, e.g. with an API key added for one request.
+        args = dict(params if params is not None else agent.params or {})
         args["model_name"] = agent.model_name
         args["provider"] = agent.provider
         args["embedding_model_provider"] = args.get(
@@ -191,11 +264,11 @@ class LangchainAgent:
         )
 
         self.langfuse = None
-        if os.getenv('LANGFUSE_PUBLIC_KEY') is not None:
-            self.langfuse = Langfuse(
-                public_key=os.getenv('LANGFUSE_PUBLIC_KEY'),
-                secret_key=os.getenv('LANGFUSE_SECRET_KEY'),
-                host=os.getenv('LANGFUSE_HOST')
+        if _LANGFUSE_ENABLED:
+            self.langfuse = get_langfuse_client(
+                _LANGFUSE_PUBLIC_KEY,
+                _LANGFUSE_SECRET_KEY,
+                _LANGFUSE_HOST
             )
 
         # agent is using current langchain model
@@ -283,11 +356,23 @@ class LangchainAgent:
             self.api_trace.update(output=response)
 
             # update metadata with tool usage
-            trace = self.langfuse.get_trace(self.trace_id)
-            trace_metadata['tool_usage'] = get_tool_usage(trace)
-            self.api_trace.update(metadata=trace_metadata)
+            # Reading the trace back has to wait for all spans to be sent, so it is done off the request thread.
+            _get_tool_usage_executor().submit(
+                self._update_trace_tool_usage, self.api_trace, self.trace_id, trace_metadata
+            )
         return response
 
+    def _update_trace_tool_usage(self, api_trace, trace_id: str, trace_metadata: Dict):
+        try:
+            if self.mdb_langfuse_callback_handler is not None:
+                self.mdb_langfuse_callback_handler.flush()
+            self.langfuse.flush()
+            trace = self.langfuse.get_trace(trace_id)
+            trace_metadata['tool_usage'] = get_tool_usage(trace)
+            api_trace.update(metadata=trace_metadata)
+        except Exception as e:
+            logger.warning(f'Could not update tool usage of langfuse trace {trace_id}: {e}')
+
     def _get_completion_stream(
         self, messages: List[dict]
     ) -> Iterable[Dict]:
@@ -429,12 +514,12 @@ class LangchainAgent:
         all_callbacks = [self.log_callback_handler]
 
         langfuse_public_key = args.get(
-            "langfuse_public_key", os.getenv("LANGFUSE_PUBLIC_KEY")
+            "langfuse_public_key", _LANGFUSE_PUBLIC_KEY
         )
         langfuse_secret_key = args.get(
-            "langfuse_secret_key", os.getenv("LANGFUSE_SECRET_KEY")
+            "langfuse_secret_key", _LANGFUSE_SECRET_KEY
         )
-        langfuse_host = args.get("langfuse_host", os.getenv("LANGFUSE_HOST"))
+        langfuse_host = args.get("langfuse_host", _LANGFUSE_HOST)
         are_langfuse_args_present = (
             bool(langfuse_public_key)
             and bool(langfuse_secret_key)
@@ -471,10 +556,10 @@ class LangchainAgent:
                 observation_id = args.get(
                     "observation_id", self.observation_id or uuid4().hex
                 )
-                langfuse = Langfuse(
-                    host=langfuse_host,
-                    public_key=langfuse_public_key,
-                    secret_key=langfuse_secret_key,
+                langfuse = get_langfuse_client(
+                    langfuse_public_key,
+                    langfuse_secret_key,
+                    langfuse_host
                 )
                 self.mdb_langfuse_callback_handler = LangfuseCallbackHandler(
                     langfuse=langfuse,
@@ -493,27 +578,27 @@ class LangchainAgent:
 
     def _handle_parsing_errors(self, error: Exception) -> str:
         response = str(error)
-        for p in _PARSING_ERROR_PREFIXES:
-            if response.startswith(p):
-                # As a somewhat dirty workaround, we accept the output formatted incorrectly and use it as a response.
-                #
-                # Ideally, in the future, we would write a parser that is more robust and flexible than the one Langchain uses.
-                # Response is wrapped in ``
-                logger.info("Handling parsing error, salvaging response...")
-                response_output = response.split("`")
-                if len(response_output) >= 2:
-                    response = response_output[-2]
-
-                # Wrap response in Langchain conversational react format.
-                langchain_react_formatted_response = f"""Thought: Do I need to use a tool? No
+        if response.startswith(_PARSING_ERROR_PREFIXES):
+            # As a somewhat dirty workaround, we accept the output formatted incorrectly and use it as a response.
+            #
+            # Ideally, in the future, we would write a parser that is more robust and flexible than the one Langchain uses.
+            # Response is wrapped in ``
+            logger.info("Handling parsing error, salvaging response...")
+            # Take the text between the last two backticks (or before the only one) without splitting the whole error.
+            end = response.rfind("`")
+            if end != -1:
+                response = response[response.rfind("`", 0, end) + 1:end]
+
+            # Wrap response in Langchain conversational react format.
+            langchain_react_formatted_response = f"""Thought: Do I need to use a tool? No
 AI: {response}"""
-                return langchain_react_formatted_response
+            return langchain_react_formatted_response
         return f"Agent failed with error:\n{str(error)}..."
 
     def run_agent(self, df: pd.DataFrame, agent: AgentExecutor, args: Dict) -> pd.DataFrame:
         base_template = args.get('prompt_template', args['prompt_template'])
         return_context = args.get('return_context', False)
-        input_variables = re.findall(r"{{(.*?)}}", base_template)
+        input_variables = _INPUT_VARIABLE_RE.findall(base_template)
 
         prompts, empty_prompt_ids = prepare_prompts(df, base_template, input_variables, args.get('user_column', USER_COLUMN))
 
@@ -561,9 +646,8 @@ AI: {response}"""
                     contexts.append([])
 
         # Add null completion for empty prompts
-        for i in sorted(empty_prompt_ids)[:-1]:
-            completions.insert(i, None)
-            contexts.insert(i, [])
+        completions = fill_empty_prompt_results(completions, empty_prompt_ids)
+        contexts = fill_empty_prompt_results(contexts, empty_prompt_ids, [])
 
         # Create DataFrame with completions and context if required
         pred_df = pd.DataFrame(
@@ -582,7 +666,7 @@ AI: {response}"""
 
     def stream_agent(self, df: pd.DataFrame, agent_executor: AgentExecutor, args: Dict) -> Iterable[Dict]:
         base_template = args.get('prompt_template', args['prompt_template'])
-        input_variables = re.findall(r"{{(.*?)}}", base_template)
+        input_variables = _INPUT_VARIABLE_RE.findall(base_template)
         return_context = args.get('return_context', False)
 
         prompts, _ = prepare_prompts(df, base_template, input_variables, args.get('user_column', USER_COLUMN))
@@ -1,9 +1,14 @@
+from collections import OrderedDict
 from typing import Any, Dict, Union, Optional, List
 from uuid import uuid4
 import datetime
 import os
+import queue
+import threading
+import time
 
 from langchain_core.callbacks.base import BaseCallbackHandler
+import orjson
 
 from mindsdb.utilities import log
 from mindsdb.interfaces.storage import db
@@ -11,100 +16,231 @@ from mindsdb.interfaces.storage import db
 logger = log.getLogger(__name__)
 logger.setLevel('DEBUG')
 
+_FLASK_ENV = os.getenv('FLASK_ENV')
+
+# Span writes applied by the worker thread per batch, and how long it waits for new ones before exiting.
+_MAX_BATCH_SIZE = 100
+_WORKER_IDLE_TIMEOUT_SECONDS = 1.0
+# Span metadata recorded as perf_counter_ns() values and formatted as ISO datetimes when written.
+_TIMESTAMP_KEYS = frozenset(('started', 'finished'))
+# Open spans kept per map. Spans whose end event never arrives are ended and dropped once the map is full.
+_MAX_OPEN_SPANS = 4096
+# Serialized chain inputs/outputs are cut to this many bytes, so huge payloads don't get rejected at ingestion.
+_MAX_PAYLOAD_BYTES = 1_000_000
+
+
+def _serialize_payload(payload: Any) -> str:
+    serialized = orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS)
+    if len(serialized) > _MAX_PAYLOAD_BYTES:
+        serialized = serialized[:_MAX_PAYLOAD_BYTES] + b'...[truncated]'
+    # The cut may land inside a multi-byte character.
+    return serialized.decode(errors='ignore')
+
 
 class LangfuseCallbackHandler(BaseCallbackHandler):
-    """Langchain callback handler that traces tool & chain executions using Langfuse."""
+    """Langchain callback handler that traces tool & chain executions using Langfuse.
+
+    Span writes are queued and applied by a background worker thread, so Langfuse calls don't block the chain.
+    """
 
     def __init__(self, langfuse, trace_id: Optional[str] = None, observation_id: Optional[str] = None):
         self.langfuse = langfuse
-        self.chain_uuid_to_span = {}
-        self.action_uuid_to_span = {}
+        # Only touched by the worker thread.
+        self.chain_uuid_to_span = OrderedDict()
+        self.action_uuid_to_span = OrderedDict()
         # if these are not available, we generate some UUIDs
         self.trace_id = trace_id or uuid4().hex
         self.observation_id = observation_id or uuid4().hex
 
+        # Callbacks only read the monotonic clock, timestamps are turned into wall time by the worker.
+        self._t0_wall = datetime.datetime.now()
+        self._t0_mono = time.perf_counter_ns()
+
+        self._events = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def _enqueue(self, fn, *args):
+        if self.langfuse is None:
+            # Tracing is not configured, there is nothing to write.
+            return
+        with self._worker_lock:
+            self._events.put((fn, args))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._drain, name='langfuse-callback-handler', daemon=True)
+                self._worker.start()
+
+    def _drain(self):
+        while True:
+            try:
+                batch = [self._events.get(timeout=_WORKER_IDLE_TIMEOUT_SECONDS)]
+            except queue.Empty:
+                with self._worker_lock:
+                    if self._events.empty():
+                        # Nothing more to do, a new worker is started by the next event.
+                        self._worker = None
+                        return
+                continue
+            while len(batch) < _MAX_BATCH_SIZE:
+                try:
+                    batch.append(self._events.get_nowait())
+                except queue.Empty:
+                    break
+            for fn, args in batch:
+                try:
+                    fn(*args)
+                except Exception as e:
+                    logger.warning(f'Could not write langfuse span: {e}')
+                finally:
+                    self._events.task_done()
+
+    def flush(self):
+        """Blocks until all queued span writes are applied."""
+        self._events.join()
+
+    @staticmethod
+    def _add_span(spans: OrderedDict, run_uuid: str, span):
+        if len(spans) >= _MAX_OPEN_SPANS:
+            _, stale_span = spans.popitem(last=False)
+            try:
+                stale_span.end()
+            except Exception as e:
+                logger.warning(f'Could not end stale langfuse span: {e}')
+        spans[run_uuid] = span
+
+    def _format_timestamp(self, timestamp_ns: int) -> str:
+        return (self._t0_wall + datetime.timedelta(microseconds=(timestamp_ns - self._t0_mono) / 1000)).isoformat()
+
+    def _update_action_span(self, run_uuid: str, metadata: Dict[str, Any], output: Optional[str] = None):
+        action_span = self.action_uuid_to_span.get(run_uuid)
+        if action_span is None:
+            return
+        for key in _TIMESTAMP_KEYS.intersection(metadata):
+            metadata[key] = self._format_timestamp(metadata[key])
+        if output is None:
+            action_span.update(metadata=metadata)
+        else:
+            action_span.update(output=output, metadata=metadata)
+
+    def _start_chain_span(self, run_uuid: str, name: str, inputs: Dict[str, Any]):
+        chain_span = self.langfuse.span(
+            name=f'{name}-{run_uuid}',
+            trace_id=self.trace_id,
+            parent_observation_id=self.observation_id,
+            input=_serialize_payload(inputs)
+        )
+        self._add_span(self.chain_uuid_to_span, run_uuid, chain_span)
+
+    def _end_chain_span(self, run_uuid: str, outputs: Dict[str, Any]):
+        if run_uuid not in self.chain_uuid_to_span:
+            return
+        chain_span = self.chain_uuid_to_span.pop(run_uuid)
+        chain_span.update(output=_serialize_payload(outputs))
+        chain_span.end()
+
+    def _fail_chain_span(self, run_uuid: str, error_str: str):
+        chain_span = self.chain_uuid_to_span.pop(run_uuid, None)
+        if chain_span is None:
+            return
+        chain_span.update(level='ERROR', status_message=error_str)
+        chain_span.end()
+
+    def _start_action_span(self, run_uuid: str, action):
+        action_span = self.langfuse.span(
+            name=f'{getattr(action, "type", "action")}-{getattr(action, "tool", "")}-{run_uuid}',
+            trace_id=self.trace_id,
+            parent_observation_id=self.observation_id,
+            input=str(action)
+        )
+        self._add_span(self.action_uuid_to_span, run_uuid, action_span)
+
+    def _end_action_span(self, run_uuid: str, finish):
+        if run_uuid not in self.action_uuid_to_span:
+            return
+        action_span = self.action_uuid_to_span.pop(run_uuid)
+        if finish is not None:
+            action_span.update(output=finish)  # supersedes tool output
+        action_span.end()
+
     def on_tool_start(
             self, serialized: Dict[str, Any], input_str: str, **kwargs: Any
     ) -> Any:
         """Run when tool starts running."""
-        parent_run_uuid = kwargs.get('parent_run_id', uuid4()).hex
-        action_span = self.action_uuid_to_span.get(parent_run_uuid)
+        parent_run_id = kwargs.get('parent_run_id')
+        if parent_run_id is None:
+            return
         metadata = {
             'tool_name': serialized.get("name", "tool"),
-            'started': datetime.datetime.now().isoformat()
+            'started': time.perf_counter_ns()
         }
-        action_span.update(metadata=metadata)
+        self._enqueue(self._update_action_span, parent_run_id.hex, metadata)
 
     def on_tool_end(self, output: str, **kwargs: Any) -> Any:
         """Run when tool ends running."""
-        parent_run_uuid = kwargs.get('parent_run_id', uuid4()).hex
-        action_span = self.action_uuid_to_span.get(parent_run_uuid)
-        action_span.update(
-            output=output,  # tool output is action output (unless superseded by a global action output)
-            metadata={'finished': datetime.datetime.now().isoformat()}
+        parent_run_id = kwargs.get('parent_run_id')
+        if parent_run_id is None:
+            return
+        self._enqueue(
+            self._update_action_span,
+            parent_run_id.hex,
+            # tool output is action output (unless superseded by a global action output)
+            {'finished': time.perf_counter_ns()},
+            output
         )
 
     def on_tool_error(
             self, error: Union[Exception, KeyboardInterrupt], **kwargs: Any
     ) -> Any:
         """Run when tool errors."""
-        parent_run_uuid = kwargs.get('parent_run_id', uuid4()).hex
-        action_span = self.action_uuid_to_span.get(parent_run_uuid)
+        parent_run_id = kwargs.get('parent_run_id')
+        if parent_run_id is None:
+            return
         try:
             error_str = str(error)
         except Exception:
             error_str = "Couldn't get error string."
-        action_span.update(metadata={'error_description': error_str})
+        self._enqueue(self._update_action_span, parent_run_id.hex, {'error_description': error_str})
 
     def on_chain_start(
             self, serialized: Dict[str, Any], inputs: Dict[str, Any], **kwargs: Any
     ) -> Any:
         """Run when chain starts running."""
         run_uuid = kwargs.get('run_id', uuid4()).hex
-        chain_span = self.langfuse.span(
-            name=f'{serialized.get("name", "chain")}-{run_uuid}',
-            trace_id=self.trace_id,
-            parent_observation_id=self.observation_id,
-            input=str(inputs)
-        )
-        self.chain_uuid_to_span[run_uuid] = chain_span
+        self._enqueue(self._start_chain_span, run_uuid, serialized.get("name", "chain"), inputs)
 
     def on_chain_end(self, outputs: Dict[str, Any], **kwargs: Any) -> Any:
         """Run when chain ends running."""
-        chain_uuid = kwargs.get('run_id', uuid4()).hex
-        if chain_uuid not in self.chain_uuid_to_span:
+        run_id = kwargs.get('run_id')
+        if run_id is None:
+            # A chain without a run id can't have a span to end.
             return
-        chain_span = self.chain_uuid_to_span.pop(chain_uuid)
-        chain_span.update(output=str(outputs))
-        chain_span.end()
+        self._enqueue(self._end_chain_span, run_id.hex, outputs)
 
     def on_chain_error(self, error: Union[Exception, KeyboardInterrupt], **kwargs: Any) -> Any:
         """Run when chain errors."""
-        # Do nothing for now.
-        pass
+        # on_chain_end is not called for a failed chain, end its span here so it's not left open.
+        run_id = kwargs.get('run_id')
+        if run_id is None:
+            return
+        try:
+            error_str = str(error)
+        except Exception:
+            error_str = "Couldn't get error string."
+        self._enqueue(self._fail_chain_span, run_id.hex, error_str)
 
     def on_agent_action(self, action, **kwargs: Any) -> Any:
         """Run on agent action."""
         # Do nothing for now.
         run_uuid = kwargs.get('run_id', uuid4()).hex
-        action_span = self.langfuse.span(
-            name=f'{getattr(action, "type", "action")}-{getattr(action, "tool", "")}-{run_uuid}',
-            trace_id=self.trace_id,
-            parent_observation_id=self.observation_id,
-            input=str(action)
-        )
-        self.action_uuid_to_span[run_uuid] = action_span
+        self._enqueue(self._start_action_span, run_uuid, action)
 
     def on_agent_finish(self, finish, **kwargs: Any) -> Any:
         """Run on agent end."""
         # Do nothing for now.
-        run_uuid = kwargs.get('run_id', uuid4()).hex
-        if run_uuid not in self.action_uuid_to_span:
+        run_id = kwargs.get('run_id')
+        if run_id is None:
             return
-        action_span = self.action_uuid_to_span.pop(run_uuid)
-        if finish is not None:
-            action_span.update(output=finish)  # supersedes tool output
-        action_span.end()
+        self._enqueue(self._end_action_span, run_id.hex, finish)
 
     def auth_check(self):
         if self.langfuse is not None:
@@ -132,8 +268,8 @@ def get_skills(agent: db.Agents) -> List:
 def get_tags(metadata: Dict) -> List:
     """ Retrieves tags from existing langfuse metadata (built using `get_metadata` and `get_skills`), and environment variables. """
     trace_tags = []
-    if os.getenv('FLASK_ENV'):
-        trace_tags.append(os.getenv('FLASK_ENV'))  # Fix: use something other than flask_env
+    if _FLASK_ENV:
+        trace_tags.append(_FLASK_ENV)  # Fix: use something other than flask_env
     if 'provider' in metadata:
         trace_tags.append(metadata['provider'])
     return trace_tags
@@ -41,6 +41,14 @@ def delete_model_storage(model_id, ctx_dump):
 class ModelController():
     config: Config
 
+    # Incremented every time this process creates, retrains, changes or deletes a model,
+    # so that cached model lookups (e.g. in AgentsController) know they are stale.
+    models_version = 0
+
+    @classmethod
+    def _on_models_changed(cls):
+        cls.models_version += 1
+
     def __init__(self) -> None:
         self.config = Config()
 
@@ -195,6 +203,7 @@ class ModelController():
             else:
                 db.session.delete(predictor_record)
         db.session.commit()
+        self._on_models_changed()
 
         # region delete storages
         if len(predictors_records) > 1:
@@ -214,6 +223,7 @@ class ModelController():
         for model_record in get_model_records(name=old_name):
             model_record.name = new_name
         db.session.commit()
+        self._on_models_changed()
 
     @staticmethod
     def _get_data_integration_ref(statement, database_controller):
@@ -305,6 +315,7 @@ class ModelController():
         if params['model_name'] in project_tables:
             raise EntityExistsError('Model already exists', f"{params['project_name']}.{params['model_name']}")
         predictor_record = ml_handler.learn(**params)
+        self._on_models_changed()
 
         return ModelController.get_model_info(predictor_record)
 
@@ -340,6 +351,7 @@ class ModelController():
         params['is_retrain'] = True
         params['set_active'] = set_active
         predictor_record = ml_handler.learn(**params)
+        self._on_models_changed()
 
         return ModelController.get_model_info(predictor_record)
 
@@ -391,6 +403,7 @@ class ModelController():
     def finetune_model(self, statement, ml_handler):
         params = self.prepare_finetune_statement(statement, ml_handler.database_controller)
         predictor_record = ml_handler.finetune(**params)
+        self._on_models_changed()
         return ModelController.get_model_info(predictor_record)
 
     def update_model(self, session, project_name: str, model_name: str, problem_definition, version=None):
@@ -412,6 +425,7 @@ class ModelController():
             learn_args['using'].update(problem_definition['using'])
             model_record.learn_args = learn_args
             db.session.commit()
+        self._on_models_changed()
 
     @staticmethod
     def get_model_info(predictor_record):
@@ -461,6 +475,7 @@ class ModelController():
             p.active = False
 
         db.session.commit()
+        self._on_models_changed()
 
     def delete_model_version(self, project_name, model_name, version):
 
@@ -485,3 +500,4 @@ class ModelController():
         modelStorage.delete()
 
         db.session.commit()
+        self._on_models_changed()
@@ -7,8 +7,7 @@ Create Date: 2024-07-19 00:48:47.629700
 """
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy.sql import table, select, update
-import mindsdb.interfaces.storage.db  # noqa
+from sqlalchemy.sql import table, update
 
 
 # revision identifiers, used by Alembic.
@@ -30,12 +29,15 @@ def upgrade():
                    sa.Column('model_name', sa.String()),
                    sa.Column('provider', sa.String()))
 
+    # values are read from the JSON column by the database, so each backfill is a single UPDATE
     conn = op.get_bind()
-    for agent in conn.execute(select(agents)):
-        if agent.params and 'provider' in agent.params:
-            conn.execute(update(agents).where(agents.c.id == agent.id).values(provider=agent.params['provider']))
-        if agent.model_name is None:
-            conn.execute(update(agents).where(agents.c.id == agent.id).values(model_name=agent.params['model_name']))
+    provider = agents.c.params['provider'].as_string()
+    conn.execute(update(agents).where(provider.isnot(None)).values(provider=provider))
+    conn.execute(
+        update(agents)
+        .where(agents.c.model_name.is_(None))
+        .values(model_name=agents.c.params['model_name'].as_string())
+    )
     # ### end Alembic commands ###
 
 
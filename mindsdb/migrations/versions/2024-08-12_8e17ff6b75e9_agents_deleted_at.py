@@ -7,7 +7,6 @@ Create Date: 2024-08-12 19:13:44.327111
 """
 from alembic import op
 import sqlalchemy as sa
-import mindsdb.interfaces.storage.db  # noqa
 
 
 # revision identifiers, used by Alembic.
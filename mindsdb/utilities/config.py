@@ -1,28 +1,38 @@
 import os
 import json
-from copy import deepcopy
-from pathlib import Path
+import stat
 
 from mindsdb.utilities.fs import create_directory, get_or_create_data_dir
 
 
-def _merge_key_recursive(target_dict, source_dict, key):
-    if key not in target_dict:
-        target_dict[key] = source_dict[key]
-    elif not isinstance(target_dict[key], dict) or not isinstance(source_dict[key], dict):
-        target_dict[key] = source_dict[key]
-    else:
-        for k in list(source_dict[key].keys()):
-            _merge_key_recursive(target_dict[key], source_dict[key], k)
+def _merge_configs(original_config, override_config):
+    """ Returns a new dict with override_config merged into original_config, nested dicts are merged key by key.
+        Dicts on the path of an override are copied, the rest of the values are shared with the inputs.
+    """
+    merged_config = original_config.copy()
+    for key, value in override_config.items():
+        original_value = merged_config.get(key)
+        if isinstance(original_value, dict) and isinstance(value, dict):
+            merged_config[key] = _merge_configs(original_value, value)
+        else:
+            merged_config[key] = value
+    return merged_config
 
 
-def _merge_configs(original_config, override_config):
-    original_config = deepcopy(original_config)
-    for key in list(override_config.keys()):
-        _merge_key_recursive(original_config, override_config, key)
-    return original_config
+def _get_config_mtime(config_path):
+    """ mtime of the config file, or None if it is not a file. Uses a single stat call """
+    try:
+        config_stat = os.stat(config_path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(config_stat.st_mode):
+        return None
+    return config_stat.st_mtime
 
 
+# keys of the config file that init_config applies with side effects (environment variables, directories)
+_INIT_CONFIG_KEYS = frozenset(('storage_dir', 'storage_db', 'permanent_storage'))
+
 config = None
 config_mtime = -1
 
@@ -36,11 +46,10 @@ class Config():
         if self.use_docker_env:
             self.use_docker_env = True
 
-        if Path(self.config_path).is_file():
-            current_config_mtime = os.path.getmtime(self.config_path)
-            if config_mtime != current_config_mtime:
-                config = self.init_config()
-                config_mtime = current_config_mtime
+        current_config_mtime = _get_config_mtime(self.config_path)
+        if current_config_mtime is not None and config_mtime != current_config_mtime:
+            config = self.init_config()
+            config_mtime = current_config_mtime
 
         if config is None:
             config = self.init_config()
@@ -73,8 +82,7 @@ class Config():
             }
         # endregion
 
-        if os.path.isdir(root_storage_dir) is False:
-            os.makedirs(root_storage_dir)
+        os.makedirs(root_storage_dir, exist_ok=True)
 
         if 'storage_db' in self._override_config:
             os.environ['MINDSDB_DB_CON'] = self._override_config['storage_db']
@@ -96,8 +104,8 @@ class Config():
         paths['cache'] = os.path.join(paths['root'], 'cache')
         paths['locks'] = os.path.join(paths['root'], 'locks')
 
-        for path_name in paths:
-            create_directory(paths[path_name])
+        for path in paths.values():
+            create_directory(path)
 
         ml_queue = {
             'type': 'local'
@@ -177,19 +185,28 @@ class Config():
         return self._config
 
     def update(self, data: dict):
-        config_path = Path(self.config_path)
-        if config_path.is_file() is False:
-            config_path.write_text('{}')
-
-        with open(self.config_path, 'r') as fp:
-            config_data = json.load(fp)
+        global config, config_mtime
+        cached_file_mtime = _get_config_mtime(self.config_path)
+        if cached_file_mtime is None:
+            # the file is created by the write below
+            config_data = {}
+        else:
+            with open(self.config_path, 'r') as fp:
+                config_data = json.load(fp)
 
         config_data = _merge_configs(config_data, data)
 
         with open(self.config_path, 'wt') as fp:
             fp.write(json.dumps(config_data, indent=4))
 
-        self.init_config()
+        if cached_file_mtime == config_mtime and config is not None and not _INIT_CONFIG_KEYS.intersection(data):
+            # the cached config reflects the file as it was before this update, so apply the update to it directly
+            config = _merge_configs(config, data)
+        else:
+            config = self.init_config()
+        # keep the new config, so the next Config() does not rebuild it again for the new mtime
+        config_mtime = _get_config_mtime(self.config_path)
+        self._config = config
 
     @property
     def paths(self):
@@ -217,6 +217,43 @@ def test_post_agent_skill_not_found(client):
     assert '404' in create_response.status
 
 
+def test_post_agents_batch(client):
+    create_request = {
+        'agents': [
+            {
+                'name': 'test_post_agents_batch_1',
+                'model_name': 'test_model',
+                'provider': 'mindsdb',
+                'skills': ['test_skill']
+            },
+            {
+                'name': 'test_post_agents_batch_2',
+                'model_name': 'test_model',
+                'provider': 'mindsdb',
+                'skills': ['overpowered_skill']
+            },
+            {
+                'model_name': 'test_model'
+            }
+        ]
+    }
+    create_response = client.post('/api/projects/mindsdb/agents:batch', json=create_request, follow_redirects=True)
+    assert '207' in create_response.status
+
+    results = create_response.get_json()
+    assert [r['status'] for r in results] == ['created', 'error', 'error']
+
+    get_response = client.get('/api/projects/mindsdb/agents/test_post_agents_batch_1', follow_redirects=True)
+    assert '200' in get_response.status
+    get_response = client.get('/api/projects/mindsdb/agents/test_post_agents_batch_2', follow_redirects=True)
+    assert '404' in get_response.status
+
+
+def test_post_agents_batch_no_agents(client):
+    create_response = client.post('/api/projects/mindsdb/agents:batch', json={}, follow_redirects=True)
+    assert '400' in create_response.status
+
+
 def test_get_agents(client):
     create_request = {
         'agent': {
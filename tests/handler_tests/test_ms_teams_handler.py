@@ -1,6 +1,9 @@
 import unittest
 from unittest.mock import Mock, patch
 
+import responses
+from responses import matchers
+
 from mindsdb_sql.parser import ast
 from mindsdb_sql.parser.ast import Constant, BinaryOperation
 
@@ -13,6 +16,9 @@ from mindsdb.integrations.handlers.ms_teams_handler.ms_graph_api_teams_client im
 from mindsdb.integrations.handlers.ms_teams_handler.ms_teams_tables import ChatsTable, ChatMessagesTable, ChannelsTable, ChannelMessagesTable
 
 
+API_URL = 'https://graph.microsoft.com/v1.0/'
+
+
 class TestMSGraphAPITeamsClient(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -23,196 +29,176 @@ class TestMSGraphAPITeamsClient(unittest.TestCase):
         # mock the api client with a dummy access_token parameter (calls to the API that use this parameter will be mocked)
         cls.api_client = MSGraphAPITeamsClient("test_access_token")
 
-    @patch('requests.get')
-    def test_get_chat_returns_chat_data(self, mock_get):
+        # intercept the requests at the transport adapter level, once for all the tests
+        cls.responses = responses.RequestsMock(assert_all_requests_are_fired=False)
+        cls.responses.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.responses.stop()
+
+    def setUp(self):
+        # forget the responses registered and the calls made by the previous test
+        self.responses.reset()
+
+    def add_get_response(self, endpoint, data, params=None):
+        """
+        Registers a successful JSON response for a GET request to the given endpoint with the expected arguments.
+        """
+
+        return self.responses.get(
+            f'{API_URL}{endpoint}/',
+            json=data,
+            match=[
+                matchers.header_matcher({'Authorization': 'Bearer test_access_token'}),
+                matchers.query_param_matcher(params or {}),
+            ]
+        )
+
+    def add_post_response(self, endpoint, data):
+        """
+        Registers a 201 response for a POST request to the given endpoint with the expected body.
+        """
+
+        return self.responses.post(
+            f'{API_URL}{endpoint}/',
+            status=201,
+            json={},
+            match=[
+                matchers.header_matcher({'Authorization': 'Bearer test_access_token'}),
+                matchers.json_params_matcher(data),
+            ]
+        )
+
+    def test_get_chat_returns_chat_data(self):
         """
         Test that get_chat returns chat data.
         """
 
-        # configure the mock to return a response with 'status_code' 200
-        mock_get.return_value = Mock(
-            status_code=200,
-            headers={'Content-Type': 'application/json'},
-            json=Mock(return_value=ms_teams_handler_config.TEST_CHAT_DATA)
+        chat_response = self.add_get_response(
+            'chats/test_id', ms_teams_handler_config.TEST_CHAT_DATA, params={'$expand': 'lastMessagePreview'}
         )
 
         chat_data = self.api_client.get_chat("test_id")
 
-        # assert the requests.get call was made with the expected arguments
-        mock_get.assert_called_once_with(
-            'https://graph.microsoft.com/v1.0/chats/test_id/',
-            headers={'Authorization': 'Bearer test_access_token'},
-            params={'$expand': 'lastMessagePreview'}
-        )
+        # assert the request was made once with the expected arguments
+        self.assertEqual(chat_response.call_count, 1)
 
         self.assertEqual(chat_data["id"], "test_id")
         self.assertEqual(chat_data["chatType"], "oneOnOne")
 
-    @patch('requests.get')
-    def test_get_chats_returns_chats_data(self, mock_get):
+    def test_get_chats_returns_chats_data(self):
         """
         Test that get_chats returns chats data.
         """
 
-        # configure the mock to return a response with 'status_code' 200
-        mock_get.return_value = Mock(
-            status_code=200,
-            headers={'Content-Type': 'application/json'},
-            json=Mock(return_value={'value': ms_teams_handler_config.TEST_CHATS_DATA})
+        chats_response = self.add_get_response(
+            'chats', {'value': ms_teams_handler_config.TEST_CHATS_DATA},
+            params={'$expand': 'lastMessagePreview', '$top': '20'}
         )
 
         chats_data = self.api_client.get_chats()
 
-        # assert the requests.get call was made with the expected arguments
-        mock_get.assert_called_once_with(
-            'https://graph.microsoft.com/v1.0/chats/',
-            headers={'Authorization': 'Bearer test_access_token'},
-            params={'$expand': 'lastMessagePreview', '$top': 20}
-        )
+        # assert the request was made once with the expected arguments
+        self.assertEqual(chats_response.call_count, 1)
 
         self.assertEqual(chats_data[0]["id"], "test_id")
         self.assertEqual(chats_data[0]["chatType"], "oneOnOne")
 
-    @patch('requests.get')
-    def test_get_chat_message_returns_chat_message_data(self, mock_get):
+    def test_get_chat_message_returns_chat_message_data(self):
         """
         Test that get_chat_message returns chat message data.
         """
 
-        # configure the mock to return a response with 'status_code' 200
-        mock_get.return_value = Mock(
-            status_code=200,
-            headers={'Content-Type': 'application/json'},
-            json=Mock(return_value=ms_teams_handler_config.TEST_CHAT_MESSAGE_DATA)
+        chat_message_response = self.add_get_response(
+            'chats/test_chat_id/messages/test_id', ms_teams_handler_config.TEST_CHAT_MESSAGE_DATA
         )
 
         chat_message_data = self.api_client.get_chat_message("test_chat_id", "test_id")
 
-        # assert the requests.get call was made with the expected arguments
-        mock_get.assert_called_once_with(
-            'https://graph.microsoft.com/v1.0/chats/test_chat_id/messages/test_id/',
-            headers={'Authorization': 'Bearer test_access_token'},
-            params=None
-        )
+        # assert the request was made once with the expected arguments
+        self.assertEqual(chat_message_response.call_count, 1)
 
         self.assertEqual(chat_message_data["id"], "test_id")
         self.assertEqual(chat_message_data["messageType"], "message")
         self.assertEqual(chat_message_data["chatId"], "test_chat_id")
 
-    @patch('requests.get')
-    def test_get_chat_messages_returns_chat_messages_data(self, mock_get):
+    def test_get_chat_messages_returns_chat_messages_data(self):
         """
         Test that get_chat_messages returns chat messages data.
         """
 
-        # configure the mock to return a response with 'status_code' 200
-        mock_get.return_value = Mock(
-            status_code=200,
-            headers={'Content-Type': 'application/json'},
-            json=Mock(return_value={'value': ms_teams_handler_config.TEST_CHAT_MESSAGES_DATA})
+        chat_messages_response = self.add_get_response(
+            'chats/test_chat_id/messages', {'value': ms_teams_handler_config.TEST_CHAT_MESSAGES_DATA},
+            params={'$top': '20'}
         )
 
         chat_messages_data = self.api_client.get_chat_messages("test_chat_id")
 
-        # assert the requests.get call was made with the expected arguments
-        mock_get.assert_called_once_with(
-            'https://graph.microsoft.com/v1.0/chats/test_chat_id/messages/',
-            headers={'Authorization': 'Bearer test_access_token'},
-            params={'$top': 20}
-        )
+        # assert the request was made once with the expected arguments
+        self.assertEqual(chat_messages_response.call_count, 1)
 
         self.assertEqual(chat_messages_data[0]["id"], "test_id")
         self.assertEqual(chat_messages_data[0]["messageType"], "message")
         self.assertEqual(chat_messages_data[0]["chatId"], "test_chat_id")
 
-    @patch('requests.get')
-    def test_get_all_chat_messages_returns_all_chat_messages_data(self, mock_get):
+    def test_get_all_chat_messages_returns_all_chat_messages_data(self):
         """
         Test that get_all_chat_messages returns all chat messages data.
         """
 
-        # configure the mock to return a response with 'status_code' 200
-        mock_get.side_effect = [
-            Mock(
-                status_code=200,
-                headers={'Content-Type': 'application/json'},
-                json=Mock(return_value={'value': ms_teams_handler_config.TEST_CHATS_DATA})
-            ),
-            Mock(
-                status_code=200,
-                headers={'Content-Type': 'application/json'},
-                json=Mock(return_value={'value': ms_teams_handler_config.TEST_CHAT_MESSAGES_DATA})
-            )
-        ]
+        chats_response = self.add_get_response(
+            'chats', {'value': ms_teams_handler_config.TEST_CHATS_DATA},
+            params={'$expand': 'lastMessagePreview', '$top': '20'}
+        )
+        chat_messages_response = self.add_get_response(
+            'chats/test_id/messages', {'value': ms_teams_handler_config.TEST_CHAT_MESSAGES_DATA},
+            params={'$top': '20'}
+        )
 
         chat_messages_data = self.api_client.get_all_chat_messages()
 
-        # assert the requests.get calls were made with the expected arguments
-        mock_get.assert_any_call(
-            'https://graph.microsoft.com/v1.0/chats/',
-            headers={'Authorization': 'Bearer test_access_token'},
-            params={'$expand': 'lastMessagePreview', '$top': 20}
-        )
-
-        mock_get.assert_any_call(
-            'https://graph.microsoft.com/v1.0/chats/test_id/messages/',
-            headers={'Authorization': 'Bearer test_access_token'},
-            params={'$top': 20}
-        )
+        # assert the requests were made with the expected arguments
+        self.assertEqual(chats_response.call_count, 1)
+        self.assertEqual(chat_messages_response.call_count, 1)
 
         self.assertEqual(chat_messages_data[0]["id"], "test_id")
         self.assertEqual(chat_messages_data[0]["messageType"], "message")
         self.assertEqual(chat_messages_data[0]["chatId"], "test_chat_id")
 
-    @patch('requests.post')
-    def test_send_chat_message_sends_correct_request(self, mock_post):
+    def test_send_chat_message_sends_correct_request(self):
         """
         Test that send_chat_message sends a chat message.
         """
 
-        # configure the mock to return a response with 'status_code' 201
-        mock_post.return_value = Mock(
-            status_code=201,
-            headers={'Content-Type': 'application/json'},
+        send_response = self.add_post_response(
+            'chats/test_chat_id/messages', {'subject': 'test_subject', 'body': {'content': 'test_message'}}
         )
 
         self.api_client.send_chat_message("test_chat_id", "test_message", "test_subject")
 
-        # assert the requests.post call was made with the expected arguments
-        mock_post.assert_called_once_with(
-            'https://graph.microsoft.com/v1.0/chats/test_chat_id/messages/',
-            headers={'Authorization': 'Bearer test_access_token'},
-            json={'subject': 'test_subject', 'body': {'content': 'test_message'}}
-        )
+        # assert the request was made once with the expected arguments
+        self.assertEqual(send_response.call_count, 1)
 
-    @patch('requests.get')
-    def test_get_channel_returns_channel_data(self, mock_get):
+    def test_get_channel_returns_channel_data(self):
         """
         Test that get_channel returns channel data.
         """
 
-        # configure the mock to return a response with 'status_code' 200
-        mock_get.return_value = Mock(
-            status_code=200,
-            headers={'Content-Type': 'application/json'},
-            json=Mock(return_value=ms_teams_handler_config.TEST_CHANNEL_DATA)
+        channel_response = self.add_get_response(
+            'teams/test_team_id/channels/test_id', ms_teams_handler_config.TEST_CHANNEL_DATA
         )
 
         channel_data = self.api_client.get_channel("test_team_id", "test_id")
 
-        # assert the requests.get call was made with the expected arguments
-        mock_get.assert_called_once_with(
-            'https://graph.microsoft.com/v1.0/teams/test_team_id/channels/test_id/',
-            headers={'Authorization': 'Bearer test_access_token'},
-            params=None
-        )
+        # assert the request was made once with the expected arguments
+        self.assertEqual(channel_response.call_count, 1)
 
         self.assertEqual(channel_data["id"], "test_id")
         self.assertEqual(channel_data["displayName"], "test_display_name")
         self.assertEqual(channel_data["teamId"], "test_team_id")
 
-    @patch('requests.get')
-    def test_get_channels_returns_channels_data(self, mock_get):
+    def test_get_channels_returns_channels_data(self):
         """
         Test that get_channels returns channels data.
         """
@@ -220,88 +206,48 @@ class TestMSGraphAPITeamsClient(unittest.TestCase):
         # check if the group_ids parameter in the API client is set
         is_group_ids_set = True if self.api_client._group_ids is not None else False
 
-        # configure the mock to return a response with 'status_code' 200
-        # if the group_ids parameter is not set, the mock will return the group data first, then the channels data
+        # if the group_ids parameter is not set, the groups are requested before the channels
         if not is_group_ids_set:
-            mock_get.side_effect = [
-                Mock(
-                    status_code=200,
-                    headers={'Content-Type': 'application/json'},
-                    json=Mock(return_value=ms_teams_handler_config.TEST_GROUP_DATA)
-                ),
-                Mock(
-                    status_code=200,
-                    headers={'Content-Type': 'application/json'},
-                    json=Mock(return_value={'value': ms_teams_handler_config.TEST_CHANNELS_DATA})
-                )
-            ]
-
-        # if the group_ids parameter is set, the mock will only return the channels data
-        else:
-            mock_get.return_value = Mock(
-                status_code=200,
-                headers={'Content-Type': 'application/json'},
-                json=Mock(return_value={'value': ms_teams_handler_config.TEST_CHANNELS_DATA})
+            groups_response = self.add_get_response(
+                'groups', ms_teams_handler_config.TEST_GROUP_DATA,
+                params={'$select': 'id,resourceProvisioningOptions'}
             )
+        channels_response = self.add_get_response(
+            'teams/test_team_id/channels', {'value': ms_teams_handler_config.TEST_CHANNELS_DATA}
+        )
 
         channels_data = self.api_client.get_channels()
 
-        # assert the requests.get calls were made with the expected arguments
-        # if the group_ids parameter is not set, the mock will check the calls to both the groups and channels endpoints
+        # assert the requests were made once with the expected arguments
         if not is_group_ids_set:
-            mock_get.assert_any_call(
-                'https://graph.microsoft.com/v1.0/groups/',
-                headers={'Authorization': 'Bearer test_access_token'},
-                params={'$select': 'id,resourceProvisioningOptions'}
-            )
-
-            mock_get.assert_any_call(
-                'https://graph.microsoft.com/v1.0/teams/test_team_id/channels/',
-                headers={'Authorization': 'Bearer test_access_token'},
-                params=None
-            )
-
-        # if the group_ids parameter is set, the mock will only check the call to the channels endpoint
-        else:
-            mock_get.assert_called_once_with(
-                'https://graph.microsoft.com/v1.0/teams/test_team_id/channels/',
-                headers={'Authorization': 'Bearer test_access_token'},
-                params=None
-            )
+            self.assertEqual(groups_response.call_count, 1)
+        self.assertEqual(channels_response.call_count, 1)
 
         self.assertEqual(channels_data[0]["id"], "test_id")
         self.assertEqual(channels_data[0]["displayName"], "test_display_name")
         self.assertEqual(channels_data[0]["teamId"], "test_team_id")
 
-    @patch('requests.get')
-    def test_get_channel_message_returns_channel_message_data(self, mock_get):
+    def test_get_channel_message_returns_channel_message_data(self):
         """
         Test that get_channel_message returns channel message data.
         """
 
-        # configure the mock to return a response with 'status_code' 200
-        mock_get.return_value = Mock(
-            status_code=200,
-            headers={'Content-Type': 'application/json'},
-            json=Mock(return_value=ms_teams_handler_config.TEST_CHANNEL_MESSAGE_DATA)
+        channel_message_response = self.add_get_response(
+            'teams/test_team_id/channels/test_channel_id/messages/test_id',
+            ms_teams_handler_config.TEST_CHANNEL_MESSAGE_DATA
         )
 
         channel_message_data = self.api_client.get_channel_message("test_team_id", "test_channel_id", "test_id")
 
-        # assert the requests.get call was made with the expected arguments
-        mock_get.assert_called_once_with(
-            'https://graph.microsoft.com/v1.0/teams/test_team_id/channels/test_channel_id/messages/test_id/',
-            headers={'Authorization': 'Bearer test_access_token'},
-            params=None
-        )
+        # assert the request was made once with the expected arguments
+        self.assertEqual(channel_message_response.call_count, 1)
 
         self.assertEqual(channel_message_data["id"], "test_id")
         self.assertEqual(channel_message_data["messageType"], "message")
         self.assertEqual(channel_message_data["channelIdentity"]["channelId"], "test_channel_id")
         self.assertEqual(channel_message_data["channelIdentity"]["teamId"], "test_team_id")
 
-    @patch('requests.get')
-    def test_get_channel_messages_returns_channel_messages_data(self, mock_get):
+    def test_get_channel_messages_returns_channel_messages_data(self):
         """
         Test that get_channel_messages returns channel messages data.
         """
@@ -309,90 +255,48 @@ class TestMSGraphAPITeamsClient(unittest.TestCase):
         # check if the group_ids parameter in the API client is set
         is_group_ids_set = True if self.api_client._group_ids is not None else False
 
-        # configure the mocks to return a response with 'status_code' 200
-        # if the group_ids parameter is not set, the mocks will return the group data first, then the channel ID data, then the channel messages data
+        # if the group_ids parameter is not set, the groups are requested before the channel IDs and the messages
         if not is_group_ids_set:
-            mock_get.side_effect = [
-                Mock(
-                    status_code=200,
-                    headers={'Content-Type': 'application/json'},
-                    json=Mock(return_value=ms_teams_handler_config.TEST_GROUP_DATA)
-                ),
-                Mock(
-                    status_code=200,
-                    headers={'Content-Type': 'application/json'},
-                    json=Mock(return_value=ms_teams_handler_config.TEST_CHANNEL_ID_DATA)
-                ),
-                Mock(
-                    status_code=200,
-                    headers={'Content-Type': 'application/json'},
-                    json=Mock(return_value={'value': ms_teams_handler_config.TEST_CHANNEL_MESSAGES_DATA})
-                ),
-            ]
-
-        # if the group_ids parameter is set, the mocks will only return the channel ID data, then the channel messages data
-        else:
-            mock_get.side_effect = [
-                Mock(
-                    status_code=200,
-                    headers={'Content-Type': 'application/json'},
-                    json=Mock(return_value=ms_teams_handler_config.TEST_CHANNEL_ID_DATA)
-                ),
-                Mock(
-                    status_code=200,
-                    headers={'Content-Type': 'application/json'},
-                    json=Mock(return_value={'value': ms_teams_handler_config.TEST_CHANNEL_MESSAGES_DATA})
-                ),
-            ]
-
-        channel_messages_data = self.api_client.get_channel_messages()
-
-        # assert the requests.get calls were made with the expected arguments
-        # if the group_ids parameter is not set, check the calls to the groups endpoint
-        if not is_group_ids_set:
-            mock_get.assert_any_call(
-                'https://graph.microsoft.com/v1.0/groups/',
-                headers={'Authorization': 'Bearer test_access_token'},
+            groups_response = self.add_get_response(
+                'groups', ms_teams_handler_config.TEST_GROUP_DATA,
                 params={'$select': 'id,resourceProvisioningOptions'}
             )
-
-        mock_get.assert_any_call(
-            'https://graph.microsoft.com/v1.0/teams/test_team_id/channels/',
-            headers={'Authorization': 'Bearer test_access_token'},
-            params=None
+        channel_ids_response = self.add_get_response(
+            'teams/test_team_id/channels', ms_teams_handler_config.TEST_CHANNEL_ID_DATA
         )
-
-        mock_get.assert_any_call(
-            'https://graph.microsoft.com/v1.0/teams/test_team_id/channels/test_channel_id/messages/',
-            headers={'Authorization': 'Bearer test_access_token'},
-            params={'$top': 20}
+        channel_messages_response = self.add_get_response(
+            'teams/test_team_id/channels/test_channel_id/messages',
+            {'value': ms_teams_handler_config.TEST_CHANNEL_MESSAGES_DATA},
+            params={'$top': '20'}
         )
 
+        channel_messages_data = self.api_client.get_channel_messages()
+
+        # assert the requests were made with the expected arguments
+        if not is_group_ids_set:
+            self.assertEqual(groups_response.call_count, 1)
+        self.assertEqual(channel_ids_response.call_count, 1)
+        self.assertEqual(channel_messages_response.call_count, 1)
+
         self.assertEqual(channel_messages_data[0]["id"], "test_id")
         self.assertEqual(channel_messages_data[0]["messageType"], "message")
         self.assertEqual(channel_messages_data[0]["channelIdentity"]["channelId"], "test_channel_id")
         self.assertEqual(channel_messages_data[0]["channelIdentity"]["teamId"], "test_team_id")
 
-    @patch('requests.post')
-    def test_send_channel_message_sends_correct_request(self, mock_post):
+    def test_send_channel_message_sends_correct_request(self):
         """
         Test that send_channel_message sends a channel message.
         """
 
-        # configure the mock to return a response with 'status_code' 201
-        mock_post.return_value = Mock(
-            status_code=201,
-            headers={'Content-Type': 'application/json'},
+        send_response = self.add_post_response(
+            'teams/test_team_id/channels/test_channel_id/messages',
+            {'subject': 'test_subject', 'body': {'content': 'test_message'}}
         )
 
         self.api_client.send_channel_message("test_team_id", "test_channel_id", "test_message", "test_subject")
 
-        # assert the requests.post call was made with the expected arguments
-        mock_post.assert_called_once_with(
-            'https://graph.microsoft.com/v1.0/teams/test_team_id/channels/test_channel_id/messages/',
-            headers={'Authorization': 'Bearer test_access_token'},
-            json={'subject': 'test_subject', 'body': {'content': 'test_message'}}
-        )
+        # assert the request was made once with the expected arguments
+        self.assertEqual(send_response.call_count, 1)
 
 
 class TestChatsTable(unittest.TestCase):
@@ -409,20 +313,19 @@ class TestChatsTable(unittest.TestCase):
         # mock the api handler
         cls.api_handler = Mock(MSTeamsHandler)
 
+        # the table only holds the handler, so it can be shared by all the tests
+        cls.chats_table = ChatsTable(cls.api_handler)
+
     def test_get_columns_returns_all_columns(self):
         """
         Test that get_columns returns all columns.
         """
 
-        chats_table = ChatsTable(self.api_handler)
-
-        self.assertListEqual(chats_table.get_columns(), ms_teams_handler_config.CHATS_TABLE_COLUMNS)
+        self.assertListEqual(self.chats_table.get_columns(), ms_teams_handler_config.CHATS_TABLE_COLUMNS)
 
     def test_select_star_for_single_chat_returns_all_columns(self):
         # patch the api handler to return the chat data
         with patch.object(self.api_handler.connect(), 'get_chat', return_value=ms_teams_handler_config.TEST_CHAT_DATA):
-            chats_table = ChatsTable(self.api_handler)
-
             select_all = ast.Select(
                 # select all columns
                 targets=[Star()],
@@ -436,7 +339,7 @@ class TestChatsTable(unittest.TestCase):
                 )
             )
 
-            all_chats = chats_table.select(select_all)
+            all_chats = self.chats_table.select(select_all)
             first_chat = all_chats.iloc[0]
 
             self.assertEqual(all_chats.shape[1], len(ms_teams_handler_config.CHATS_TABLE_COLUMNS))
@@ -446,15 +349,13 @@ class TestChatsTable(unittest.TestCase):
     def test_select_star_for_all_chats_returns_all_columns(self):
         # patch the api handler to return the chat data
         with patch.object(self.api_handler.connect(), 'get_chats', return_value=ms_teams_handler_config.TEST_CHATS_DATA):
-            chats_table = ChatsTable(self.api_handler)
-
             select_all = ast.Select(
                 # select all columns
                 targets=[Star()],
                 from_table="chats",
             )
 
-            all_chats = chats_table.select(select_all)
+            all_chats = self.chats_table.select(select_all)
             first_chat = all_chats.iloc[0]
 
             self.assertEqual(all_chats.shape[1], len(ms_teams_handler_config.CHATS_TABLE_COLUMNS))
@@ -464,8 +365,6 @@ class TestChatsTable(unittest.TestCase):
     def test_select_for_single_chat_returns_only_selected_columns(self):
         # patch the api handler to return the chat data
         with patch.object(self.api_handler.connect(), 'get_chat', return_value=ms_teams_handler_config.TEST_CHAT_DATA):
-            chats_table = ChatsTable(self.api_handler)
-
             select_all = ast.Select(
                 # select only the id and chatType columns
                 targets=[
@@ -482,7 +381,7 @@ class TestChatsTable(unittest.TestCase):
                 )
             )
 
-            all_chats = chats_table.select(select_all)
+            all_chats = self.chats_table.select(select_all)
             first_chat = all_chats.iloc[0]
 
             self.assertEqual(all_chats.shape[1], 2)
@@ -492,8 +391,6 @@ class TestChatsTable(unittest.TestCase):
     def test_select_for_all_chats_returns_only_selected_columns(self):
         # patch the api handler to return the chat data
         with patch.object(self.api_handler.connect(), 'get_chats', return_value=ms_teams_handler_config.TEST_CHATS_DATA):
-            chats_table = ChatsTable(self.api_handler)
-
             select_all = ast.Select(
                 # select all columns
                 targets=[
@@ -503,7 +400,7 @@ class TestChatsTable(unittest.TestCase):
                 from_table="chats",
             )
 
-            all_chats = chats_table.select(select_all)
+            all_chats = self.chats_table.select(select_all)
             first_chat = all_chats.iloc[0]
 
             self.assertEqual(all_chats.shape[1], 2)
@@ -525,20 +422,19 @@ class TestChatMessagesTable(unittest.TestCase):
         # mock the api handler
         cls.api_handler = Mock(MSTeamsHandler)
 
+        # the table only holds the handler, so it can be shared by all the tests
+        cls.chat_messages_table = ChatMessagesTable(cls.api_handler)
+
     def test_get_columns_returns_all_columns(self):
         """
         Test that get_columns returns all columns.
         """
 
-        chat_messages_table = ChatMessagesTable(self.api_handler)
-
-        self.assertListEqual(chat_messages_table.get_columns(), ms_teams_handler_config.CHAT_MESSAGES_TABLE_COLUMNS)
+        self.assertListEqual(self.chat_messages_table.get_columns(), ms_teams_handler_config.CHAT_MESSAGES_TABLE_COLUMNS)
 
     def test_select_star_for_single_chat_returns_all_columns(self):
         # patch the api handler to return the chat message data
         with patch.object(self.api_handler.connect(), 'get_chat_message', return_value=ms_teams_handler_config.TEST_CHAT_MESSAGE_DATA):
-            chat_messages_table = ChatMessagesTable(self.api_handler)
-
             select_all = ast.Select(
                 # select all columns
                 targets=[Star()],
@@ -561,7 +457,7 @@ class TestChatMessagesTable(unittest.TestCase):
                 ]
             )
 
-            all_chat_messages = chat_messages_table.select(select_all)
+            all_chat_messages = self.chat_messages_table.select(select_all)
             first_chat_message = all_chat_messages.iloc[0]
 
             self.assertEqual(all_chat_messages.shape[1], len(ms_teams_handler_config.CHAT_MESSAGES_TABLE_COLUMNS))
@@ -571,8 +467,6 @@ class TestChatMessagesTable(unittest.TestCase):
     def test_select_star_for_multiple_chats_returns_all_columns(self):
         # patch the api handler to return the chat message data
         with patch.object(self.api_handler.connect(), 'get_chat_messages', return_value=ms_teams_handler_config.TEST_CHAT_MESSAGES_DATA):
-            chat_messages_table = ChatMessagesTable(self.api_handler)
-
             select_all = ast.Select(
                 # select all columns
                 targets=[Star()],
@@ -588,7 +482,7 @@ class TestChatMessagesTable(unittest.TestCase):
                 ]
             )
 
-            all_chat_messages = chat_messages_table.select(select_all)
+            all_chat_messages = self.chat_messages_table.select(select_all)
             first_chat_message = all_chat_messages.iloc[0]
 
             self.assertEqual(all_chat_messages.shape[1], len(ms_teams_handler_config.CHAT_MESSAGES_TABLE_COLUMNS))
@@ -598,15 +492,13 @@ class TestChatMessagesTable(unittest.TestCase):
     def test_select_star_for_all_chats_returns_all_columns(self):
         # patch the api handler to return the chat message data
         with patch.object(self.api_handler.connect(), 'get_all_chat_messages', return_value=ms_teams_handler_config.TEST_CHAT_MESSAGES_DATA):
-            chat_messages_table = ChatMessagesTable(self.api_handler)
-
             select_all = ast.Select(
                 # select all columns
                 targets=[Star()],
                 from_table="chat_messages",
             )
 
-            all_chat_messages = chat_messages_table.select(select_all)
+            all_chat_messages = self.chat_messages_table.select(select_all)
             first_chat_message = all_chat_messages.iloc[0]
 
             self.assertEqual(all_chat_messages.shape[1], len(ms_teams_handler_config.CHAT_MESSAGES_TABLE_COLUMNS))
@@ -616,8 +508,6 @@ class TestChatMessagesTable(unittest.TestCase):
     def test_select_for_single_chat_returns_only_selected_columns(self):
         # patch the api handler to return the chat message data
         with patch.object(self.api_handler.connect(), 'get_chat_message', return_value=ms_teams_handler_config.TEST_CHAT_MESSAGE_DATA):
-            chat_messages_table = ChatMessagesTable(self.api_handler)
-
             select_all = ast.Select(
                 # select only the id and messageType columns
                 targets=[
@@ -643,7 +533,7 @@ class TestChatMessagesTable(unittest.TestCase):
                 ]
             )
 
-            all_chat_messages = chat_messages_table.select(select_all)
+            all_chat_messages = self.chat_messages_table.select(select_all)
             first_chat_message = all_chat_messages.iloc[0]
 
             self.assertEqual(all_chat_messages.shape[1], 2)
@@ -653,8 +543,6 @@ class TestChatMessagesTable(unittest.TestCase):
     def test_select_for_multiple_chats_returns_only_selected_columns(self):
         # patch the api handler to return the chat message data
         with patch.object(self.api_handler.connect(), 'get_chat_messages', return_value=ms_teams_handler_config.TEST_CHAT_MESSAGES_DATA):
-            chat_messages_table = ChatMessagesTable(self.api_handler)
-
             select_all = ast.Select(
                 # select only the id and messageType columns
                 targets=[
@@ -673,7 +561,7 @@ class TestChatMessagesTable(unittest.TestCase):
                 ]
             )
 
-            all_chat_messages = chat_messages_table.select(select_all)
+            all_chat_messages = self.chat_messages_table.select(select_all)
             first_chat_message = all_chat_messages.iloc[0]
 
             self.assertEqual(all_chat_messages.shape[1], 2)
@@ -683,8 +571,6 @@ class TestChatMessagesTable(unittest.TestCase):
     def test_select_for_all_chats_returns_only_selected_columns(self):
         # patch the api handler to return the chat message data
         with patch.object(self.api_handler.connect(), 'get_all_chat_messages', return_value=ms_teams_handler_config.TEST_CHAT_MESSAGES_DATA):
-            chat_messages_table = ChatMessagesTable(self.api_handler)
-
             select_all = ast.Select(
                 # select only the id and messageType columns
                 targets=[
@@ -694,7 +580,7 @@ class TestChatMessagesTable(unittest.TestCase):
                 from_table="chat_messages",
             )
 
-            all_chat_messages = chat_messages_table.select(select_all)
+            all_chat_messages = self.chat_messages_table.select(select_all)
             first_chat_message = all_chat_messages.iloc[0]
 
             self.assertEqual(all_chat_messages.shape[1], 2)
@@ -708,7 +594,6 @@ class TestChatMessagesTable(unittest.TestCase):
 
         # patch the api handler to return the chat message data
         with patch.object(self.api_handler.connect(), 'send_chat_message', return_value=None) as mock_send_chat_message:
-            chat_messages_table = ChatMessagesTable(self.api_handler)
 
             insert = ast.Insert(
                 table="chat_messages",
@@ -726,7 +611,7 @@ class TestChatMessagesTable(unittest.TestCase):
                 ]
             )
 
-            chat_messages_table.insert(insert)
+            self.chat_messages_table.insert(insert)
 
             # assert the api handler's send_chat_message method was called with the expected arguments
             mock_send_chat_message.assert_called_once_with(chat_id='test_chat_id', message='test_message', subject='test_subject')
@@ -746,20 +631,19 @@ class TestChannelsTable(unittest.TestCase):
         # mock the api handler
         cls.api_handler = Mock(MSTeamsHandler)
 
+        # the table only holds the handler, so it can be shared by all the tests
+        cls.channels_table = ChannelsTable(cls.api_handler)
+
     def test_get_columns_returns_all_columns(self):
         """
         Test that get_columns returns all columns.
         """
 
-        channels_table = ChannelsTable(self.api_handler)
-
-        self.assertListEqual(channels_table.get_columns(), ms_teams_handler_config.CHANNELS_TABLE_COLUMNS)
+        self.assertListEqual(self.channels_table.get_columns(), ms_teams_handler_config.CHANNELS_TABLE_COLUMNS)
 
     def test_select_star_for_single_channel_returns_all_columns(self):
         # patch the api handler to return the channel data
         with patch.object(self.api_handler.connect(), 'get_channel', return_value=ms_teams_handler_config.TEST_CHANNEL_DATA):
-            channels_table = ChannelsTable(self.api_handler)
-
             select_all = ast.Select(
                 # select all columns
                 targets=[Star()],
@@ -782,7 +666,7 @@ class TestChannelsTable(unittest.TestCase):
                 ]
             )
 
-            all_channels = channels_table.select(select_all)
+            all_channels = self.channels_table.select(select_all)
             first_channel = all_channels.iloc[0]
 
             self.assertEqual(all_channels.shape[1], len(ms_teams_handler_config.CHANNELS_TABLE_COLUMNS))
@@ -792,15 +676,13 @@ class TestChannelsTable(unittest.TestCase):
     def test_select_star_for_all_channels_returns_all_columns(self):
         # patch the api handler to return the channel data
         with patch.object(self.api_handler.connect(), 'get_channels', return_value=ms_teams_handler_config.TEST_CHANNELS_DATA):
-            channels_table = ChannelsTable(self.api_handler)
-
             select_all = ast.Select(
                 # select all columns
                 targets=[Star()],
                 from_table="channels",
             )
 
-            all_channels = channels_table.select(select_all)
+            all_channels = self.channels_table.select(select_all)
             first_channel = all_channels.iloc[0]
 
             self.assertEqual(all_channels.shape[1], len(ms_teams_handler_config.CHANNELS_TABLE_COLUMNS))
@@ -810,8 +692,6 @@ class TestChannelsTable(unittest.TestCase):
     def test_select_for_single_channel_returns_only_selected_columns(self):
         # patch the api handler to return the channel data
         with patch.object(self.api_handler.connect(), 'get_channel', return_value=ms_teams_handler_config.TEST_CHANNEL_DATA):
-            channels_table = ChannelsTable(self.api_handler)
-
             select_all = ast.Select(
                 # select only the id and displayName columns
                 targets=[
@@ -837,7 +717,7 @@ class TestChannelsTable(unittest.TestCase):
                 ]
             )
 
-            all_channels = channels_table.select(select_all)
+            all_channels = self.channels_table.select(select_all)
             first_channel = all_channels.iloc[0]
 
             self.assertEqual(all_channels.shape[1], 2)
@@ -847,8 +727,6 @@ class TestChannelsTable(unittest.TestCase):
     def test_select_for_all_channels_returns_only_selected_columns(self):
         # patch the api handler to return the channel data
         with patch.object(self.api_handler.connect(), 'get_channels', return_value=ms_teams_handler_config.TEST_CHANNELS_DATA):
-            channels_table = ChannelsTable(self.api_handler)
-
             select_all = ast.Select(
                 # select only the id and displayName columns
                 targets=[
@@ -858,7 +736,7 @@ class TestChannelsTable(unittest.TestCase):
                 from_table="channels",
             )
 
-            all_channels = channels_table.select(select_all)
+            all_channels = self.channels_table.select(select_all)
             first_channel = all_channels.iloc[0]
 
             self.assertEqual(all_channels.shape[1], 2)
@@ -880,20 +758,19 @@ class TestChannelMessagesTable(unittest.TestCase):
         # mock the api handler
         cls.api_handler = Mock(MSTeamsHandler)
 
+        # the table only holds the handler, so it can be shared by all the tests
+        cls.channel_messages_table = ChannelMessagesTable(cls.api_handler)
+
     def test_get_columns_returns_all_columns(self):
         """
         Test that get_columns returns all columns.
         """
 
-        channel_messages_table = ChannelMessagesTable(self.api_handler)
-
-        self.assertListEqual(channel_messages_table.get_columns(), ms_teams_handler_config.CHANNEL_MESSAGES_TABLE_COLUMNS)
+        self.assertListEqual(self.channel_messages_table.get_columns(), ms_teams_handler_config.CHANNEL_MESSAGES_TABLE_COLUMNS)
 
     def test_select_star_for_single_channel_message_returns_all_columns(self):
         # patch the api handler to return the channel message data
         with patch.object(self.api_handler.connect(), 'get_channel_message', return_value=ms_teams_handler_config.TEST_CHANNEL_MESSAGE_DATA):
-            channel_messages_table = ChannelMessagesTable(self.api_handler)
-
             select_all = ast.Select(
                 # select all columns
                 targets=[Star()],
@@ -923,7 +800,7 @@ class TestChannelMessagesTable(unittest.TestCase):
                 ]
             )
 
-            all_channel_messages = channel_messages_table.select(select_all)
+            all_channel_messages = self.channel_messages_table.select(select_all)
             first_channel_message = all_channel_messages.iloc[0]
 
             self.assertEqual(all_channel_messages.shape[1], len(ms_teams_handler_config.CHANNEL_MESSAGES_TABLE_COLUMNS))
@@ -933,15 +810,13 @@ class TestChannelMessagesTable(unittest.TestCase):
     def test_select_star_for_all_channel_messages_returns_all_columns(self):
         # patch the api handler to return the channel message data
         with patch.object(self.api_handler.connect(), 'get_channel_messages', return_value=ms_teams_handler_config.TEST_CHANNEL_MESSAGES_DATA):
-            channel_messages_table = ChannelMessagesTable(self.api_handler)
-
             select_all = ast.Select(
                 # select all columns
                 targets=[Star()],
                 from_table="channel_messages",
             )
 
-            all_channel_messages = channel_messages_table.select(select_all)
+            all_channel_messages = self.channel_messages_table.select(select_all)
             first_channel_message = all_channel_messages.iloc[0]
 
             self.assertEqual(all_channel_messages.shape[1], len(ms_teams_handler_config.CHANNEL_MESSAGES_TABLE_COLUMNS))
@@ -951,8 +826,6 @@ class TestChannelMessagesTable(unittest.TestCase):
     def test_select_for_single_channel_message_returns_only_selected_columns(self):
         # patch the api handler to return the channel message data
         with patch.object(self.api_handler.connect(), 'get_channel_message', return_value=ms_teams_handler_config.TEST_CHANNEL_MESSAGE_DATA):
-            channel_messages_table = ChannelMessagesTable(self.api_handler)
-
             select_all = ast.Select(
                 # select only the id and messageType columns
                 targets=[
@@ -985,7 +858,7 @@ class TestChannelMessagesTable(unittest.TestCase):
                 ]
             )
 
-            all_channel_messages = channel_messages_table.select(select_all)
+            all_channel_messages = self.channel_messages_table.select(select_all)
             first_channel_message = all_channel_messages.iloc[0]
 
             self.assertEqual(all_channel_messages.shape[1], 2)
@@ -995,8 +868,6 @@ class TestChannelMessagesTable(unittest.TestCase):
     def test_select_for_all_channel_messages_returns_only_selected_columns(self):
         # patch the api handler to return the channel message data
         with patch.object(self.api_handler.connect(), 'get_channel_messages', return_value=ms_teams_handler_config.TEST_CHANNEL_MESSAGES_DATA):
-            channel_messages_table = ChannelMessagesTable(self.api_handler)
-
             select_all = ast.Select(
                 # select only the id and messageType columns
                 targets=[
@@ -1006,7 +877,7 @@ class TestChannelMessagesTable(unittest.TestCase):
                 from_table="channel_messages",
             )
 
-            all_channel_messages = channel_messages_table.select(select_all)
+            all_channel_messages = self.channel_messages_table.select(select_all)
             first_channel_message = all_channel_messages.iloc[0]
 
             self.assertEqual(all_channel_messages.shape[1], 2)
@@ -1020,7 +891,6 @@ class TestChannelMessagesTable(unittest.TestCase):
 
         # patch the api handler to return the channel message data
         with patch.object(self.api_handler.connect(), 'send_channel_message', return_value=None) as mock_send_channel_message:
-            channel_messages_table = ChannelMessagesTable(self.api_handler)
 
             insert = ast.Insert(
                 table="channel_messages",
@@ -1040,7 +910,7 @@ class TestChannelMessagesTable(unittest.TestCase):
                 ]
             )
 
-            channel_messages_table.insert(insert)
+            self.channel_messages_table.insert(insert)
 
             # assert the api handler's send_channel_message method was called with the expected arguments
             mock_send_channel_message.assert_called_once_with(group_id='test_team_id', channel_id='test_channel_id', message='test_message', subject='test_subject')
@@ -1,9 +1,10 @@
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pandas as pd
 
 from mindsdb.interfaces.storage import db
 from mindsdb.interfaces.agents.agents_controller import AgentsController
+from mindsdb.interfaces.model.model_controller import ModelController
 
 
 @patch('mindsdb.api.executor.datahub.datanodes.project_datanode.ProjectDataNode')
@@ -41,3 +42,20 @@ def test_get_completion(mock_model_controller, mock_schema_datanode, mock_projec
     assert not completion_df.empty
     assert 'answer' in completion_df.columns
     assert completion_df['answer'].loc[0] == '42'
+
+
+def test_get_model_cache():
+    model_controller = MagicMock()
+    model_controller.get_model.return_value = {'name': 'test_cached_model', 'problem_definition': {'using': {}}}
+    agents_controller = AgentsController(MagicMock(), MagicMock(), model_controller=model_controller)
+
+    model = agents_controller._get_model('test_cached_model')
+    model['problem_definition']['using']['prompt_template'] = 'changed'
+    assert agents_controller._get_model('test_cached_model') == model_controller.get_model.return_value
+    assert 'prompt_template' not in agents_controller._get_model('test_cached_model')['problem_definition']['using']
+    model_controller.get_model.assert_called_once()
+
+    # Changes to models in this process drop the cached lookups.
+    ModelController._on_models_changed()
+    agents_controller._get_model('test_cached_model')
+    assert model_controller.get_model.call_count == 2
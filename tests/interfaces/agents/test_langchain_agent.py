@@ -0,0 +1,62 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from mindsdb.interfaces.agents.langchain_agent import (
+    fill_empty_prompt_results,
+    prepare_prompts,
+    _flush_tool_usage_updates,
+    _get_tool_usage_executor,
+)
+
+
+def test_prepare_prompts():
+    df = pd.DataFrame(
+        {
+            'question': ['q1', None, np.nan, 'q4'],
+            'context': ['c1', None, 'c3', np.nan],
+            'user': [None, 'user input', None, None],
+        },
+        index=[10, 5, 7, 3]
+    )
+    prompts, empty_prompt_ids = prepare_prompts(df, 'Q: {{question}} C: {{context}}', ['question', 'context'], 'user')
+
+    # Empty prompts are identified by position, whatever the index of the DataFrame.
+    assert empty_prompt_ids == {1}
+    # Rows with only some missing values are still formatted, NaN values as 'nan' and None values as ''.
+    assert prompts == ['Q: q1 C: c1', 'user input', 'Q: nan C: c3', 'Q: q4 C: nan']
+
+
+def test_prepare_prompts_without_input_variables():
+    df = pd.DataFrame({'question': ['What is the meaning of life?']})
+    prompts, empty_prompt_ids = prepare_prompts(df, 'What is the meaning of life?', [], 'question')
+
+    assert empty_prompt_ids == {0}
+    assert prompts == ['What is the meaning of life?']
+
+
+def test_fill_empty_prompt_results():
+    # Every empty prompt but the last one gets the fill value.
+    assert fill_empty_prompt_results(['a', 'b', 'c'], {1, 3}) == ['a', None, 'b', 'c']
+
+
+def test_tool_usage_updates_share_one_worker():
+    executor = _get_tool_usage_executor()
+    assert _get_tool_usage_executor() is executor
+
+    thread_names = set()
+
+    def job():
+        time.sleep(0.01)
+        thread_names.add(threading.current_thread().name)
+
+    futures = [executor.submit(job) for _ in range(5)]
+    # Pending updates are waited for on shutdown.
+    _flush_tool_usage_updates()
+
+    assert all(future.done() for future in futures)
+    assert len(thread_names) == 1
+    # A new worker is started for later updates.
+    assert _get_tool_usage_executor() is not executor
@@ -164,19 +164,28 @@ class BaseDatabaseHandlerTest(BaseHandlerTest):
         """
         pass
 
+    def create_mock_cursor(self):
+        """
+        Create and return the mock cursor that is used in the `test_native_query` method.
+        This method can be overridden in subclasses to set up the attributes of the cursor that are specific to the database client.
+        """
+        return MockCursorContextManager()
+
     def test_native_query(self):
         """
         Tests the `native_query` method to ensure it executes a SQL query using a mock cursor and returns a Response object.
         """
-        mock_conn = MagicMock()
-        mock_cursor = MockCursorContextManager()
+        # The connection is not used as a context manager, so it does not need the magic methods of a MagicMock.
+        mock_conn = Mock()
+        mock_cursor = self.create_mock_cursor()
 
-        self.handler.connect = MagicMock(return_value=mock_conn)
-        mock_conn.cursor = MagicMock(return_value=mock_cursor)
+        self.handler.connect = Mock(return_value=mock_conn)
+        mock_conn.cursor = Mock(return_value=mock_cursor)
 
         query_str = f"SELECT * FROM {self.mock_table}"
         data = self.handler.native_query(query_str)
 
+        mock_cursor.execute.assert_called_once_with(query_str)
         assert isinstance(data, Response)
         self.assertFalse(data.error_code)
 
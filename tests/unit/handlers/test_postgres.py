@@ -1,38 +1,37 @@
-from collections import OrderedDict
+from types import MappingProxyType, SimpleNamespace
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
 import psycopg
 from psycopg.pq import ExecStatus
 
 from base_handler_test import BaseDatabaseHandlerTest, MockCursorContextManager
 from mindsdb.integrations.handlers.postgres_handler.postgres_handler import PostgresHandler
-from mindsdb.integrations.libs.response import (
-    HandlerResponse as Response
-)
+
+# Read-only, so that it can be shared by all the tests.
+DUMMY_CONNECTION_DATA = MappingProxyType({
+    'host': '127.0.0.1',
+    'port': 5432,
+    'user': 'example_user',
+    'schema': 'public',
+    'password': 'example_pass',
+    'database': 'example_db',
+    'sslmode': 'prefer'
+})
 
 
 class TestPostgresHandler(BaseDatabaseHandlerTest, unittest.TestCase):
 
     @property
     def dummy_connection_data(self):
-        return OrderedDict(
-            host='127.0.0.1',
-            port=5432,
-            user='example_user',
-            schema='public',
-            password='example_pass',
-            database='example_db',
-            sslmode='prefer'
-        )
+        return DUMMY_CONNECTION_DATA
 
     @property
     def err_to_raise_on_connect_failure(self):
         return psycopg.Error("Connection Failed")
 
-    @property
-    def get_tables_query(self):
-        return """
+    # Kept verbatim, it is compared with the query string of the handler.
+    get_tables_query = """
             SELECT
                 table_schema,
                 table_name,
@@ -65,29 +64,14 @@ class TestPostgresHandler(BaseDatabaseHandlerTest, unittest.TestCase):
     def create_patcher(self):
         return patch('psycopg.connect')
 
-    def test_native_query(self):
+    def create_mock_cursor(self):
         """
-        Tests the `native_query` method to ensure it executes a SQL query using a mock cursor,
-        returns a Response object, and correctly handles the ExecStatus scenario
+        The Postgres handler reads the status of the executed query from the `pgresult` attribute of the cursor.
+        The cursor is specced on `psycopg.Cursor`, so the handler can only use attributes that a real cursor has.
         """
-        # TODO: Can this be handled via the base class? The use of ExecStatus is specific to Postgres.
-        mock_conn = MagicMock()
-        mock_cursor = MockCursorContextManager()
-
-        self.handler.connect = MagicMock(return_value=mock_conn)
-        mock_conn.cursor = MagicMock(return_value=mock_cursor)
-
-        mock_cursor.execute.return_value = None
-
-        mock_pgresult = MagicMock()
-        mock_pgresult.status = ExecStatus.COMMAND_OK
-        mock_cursor.pgresult = mock_pgresult
-
-        query_str = "SELECT * FROM table"
-        data = self.handler.native_query(query_str)
-        mock_cursor.execute.assert_called_once_with(query_str)
-        assert isinstance(data, Response)
-        self.assertFalse(data.error_code)
+        mock_cursor = MockCursorContextManager(spec=psycopg.Cursor)
+        mock_cursor.pgresult = SimpleNamespace(status=ExecStatus.COMMAND_OK)
+        return mock_cursor
 
 
 if __name__ == '__main__':
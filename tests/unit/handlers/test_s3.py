@@ -158,9 +158,10 @@ class TestS3Handler(BaseHandlerTestSetup, unittest.TestCase):
         response = self.handler.query(select)
 
         mock_conn.execute.assert_called_once_with(
-            f"CREATE TABLE IF NOT EXISTS {self.handler.table_name} AS SELECT * FROM 's3://{self.dummy_connection_data['bucket']}/{object_name.replace('`', '')}'"
+            f"CREATE VIEW IF NOT EXISTS {self.handler.table_name} AS SELECT * FROM 's3://{self.dummy_connection_data['bucket']}/{object_name.replace('`', '')}'"
         )
         mock_cursor.execute.assert_called_once_with(f"SELECT * FROM {self.handler.table_name}")
+        mock_cursor.fetchdf.assert_called_once()
 
         assert isinstance(response, Response)
         self.assertFalse(response.error_code)
@@ -213,20 +214,27 @@ class TestS3Handler(BaseHandlerTestSetup, unittest.TestCase):
     @patch('boto3.client')
     def test_get_tables(self, mock_boto3_client):
         """
-        Test that the `get_tables` method correctly calls the `list_objects_v2` method and returns a Response object with the supported objects (files).
+        Test that the `get_tables` method correctly pages through `list_objects_v2` and returns a Response object with the supported objects (files).
         """
-        # Mock the boto3 client object and its methods.
+        # Mock the boto3 client object and its paginator; the objects are split across two pages.
         mock_boto3_client_instance = MagicMock()
         mock_boto3_client.return_value = mock_boto3_client_instance
-        mock_boto3_client_instance.list_objects_v2.return_value = {
-            'Contents': [
-                {'Key': 'file1.csv'},
-                {'Key': 'file2.tsv'},
-                {'Key': 'file3.json'},
-                {'Key': 'file4.parquet'},
-                {'Key': 'file5.xlsx'},
-            ]
-        }
+        mock_paginator = mock_boto3_client_instance.get_paginator.return_value
+        mock_paginator.paginate.return_value = [
+            {
+                'Contents': [
+                    {'Key': 'file1.csv'},
+                    {'Key': 'file2.tsv'},
+                    {'Key': 'file3.json'},
+                ]
+            },
+            {
+                'Contents': [
+                    {'Key': 'file4.parquet'},
+                    {'Key': 'file5.xlsx'},
+                ]
+            },
+        ]
 
         response = self.handler.get_tables()
 
@@ -235,32 +243,47 @@ class TestS3Handler(BaseHandlerTestSetup, unittest.TestCase):
 
         df = response.data_frame
         self.assertEqual(len(df), 4)
-        self.assertNotIn('file5.xlsx', df['table_name'].values)
+        self.assertNotIn('`file5.xlsx`', df['table_name'].values)
+        mock_boto3_client_instance.get_paginator.assert_called_once_with('list_objects_v2')
+        mock_paginator.paginate.assert_called_once_with(Bucket=self.dummy_connection_data['bucket'])
 
-    @patch('mindsdb.integrations.handlers.s3_handler.s3_handler.S3Handler.native_query')
-    def test_get_columns(self, mock_native_query):
+    def test_get_columns(self):
         """
-        Test that the `get_columns` method correctly constructs the SQL query and calls `native_query` with the correct query.
+        Test that the `get_columns` method describes the object with DuckDB and returns a Response object with its columns.
         """
-        mock_native_query.return_value = Response(
-            RESPONSE_TYPE.TABLE,
-            data_frame=pd.DataFrame(
-                data={
-                    'col_1': ['row_1', 'row_2', 'row_3'],
-                    'col_2': [1, 2, 3],
-                },
-            )
+        mock_conn = MagicMock()
+        self.handler.connect = MagicMock(return_value=mock_conn)
+        mock_conn.execute.return_value.fetchdf.return_value = pd.DataFrame(
+            data={
+                'column_name': ['col_1', 'col_2'],
+                'column_type': ['VARCHAR', 'BIGINT'],
+            }
         )
 
-        table_name = 'mock_table'
-        response = self.handler.get_columns(table_name)
+        response = self.handler.get_columns(self.object_name)
 
-        expected_query = f"""SELECT * FROM {table_name} LIMIT 5"""
-        self.handler.native_query.assert_called_once_with(expected_query)
+        mock_conn.execute.assert_called_once_with(
+            f"DESCRIBE SELECT * FROM 's3://{self.dummy_connection_data['bucket']}/{self.object_name.replace('`', '')}'"
+        )
 
         df = response.data_frame
         self.assertEqual(df.columns.tolist(), ['column_name', 'data_type'])
-        self.assertEqual(df['data_type'].values.tolist(), ['string', 'int64'])
+        self.assertEqual(df['column_name'].values.tolist(), ['col_1', 'col_2'])
+        self.assertEqual(df['data_type'].values.tolist(), ['VARCHAR', 'BIGINT'])
+
+    def test_get_columns_closes_connection_on_error(self):
+        """
+        Test that the `get_columns` method closes the connection it opened when describing the object fails.
+        """
+        mock_conn = MagicMock()
+        mock_conn.execute.side_effect = Exception('No files found that match the pattern')
+        self.handler.connect = MagicMock(return_value=mock_conn)
+        self.handler.disconnect = MagicMock()
+
+        with self.assertRaises(Exception):
+            self.handler.get_columns(self.object_name)
+
+        self.handler.disconnect.assert_called_once()
 
 
 if __name__ == '__main__':
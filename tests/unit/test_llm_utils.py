@@ -5,7 +5,7 @@ import pandas as pd
 
 from mindsdb.integrations.libs.llm.utils import ft_chat_formatter, ft_code_formatter, ft_cqa_formatter
 from mindsdb.integrations.libs.llm.utils import ft_jsonl_validation, ft_chat_format_validation
-from mindsdb.integrations.libs.llm.utils import get_completed_prompts
+from mindsdb.integrations.libs.llm.utils import get_completed_prompts, get_empty_prompt_ids, get_empty_prompt_id_set
 
 
 class TestLLM(unittest.TestCase):
@@ -116,6 +116,21 @@ class TestLLM(unittest.TestCase):
         with self.assertRaises(Exception):
             get_completed_prompts(base_template, df)
 
+    def test_get_empty_prompt_ids(self):
+        df = pd.DataFrame({
+            'context': ['a', None, None, 'd'],
+            'question': [None, 'b', None, None],
+        })
+        assert get_empty_prompt_ids(df, ['context', 'question']).tolist() == [2]
+        assert get_empty_prompt_ids(df, ['question']).tolist() == [0, 2, 3]
+
+    def test_get_empty_prompt_id_set(self):
+        df = pd.DataFrame({'question': [None, 'b', None]})
+        id_set = get_empty_prompt_id_set(get_empty_prompt_ids(df, ['question']))
+        assert id_set == {0, 2}
+        assert all(type(i) is int for i in id_set)
+        assert get_empty_prompt_id_set([]) == set()
+
     def test_ft_chat_format_validation(self):
         for chat in self.valid_chats:
             ft_chat_format_validation(chat)  # if chat is valid, returns `None`
@@ -184,6 +199,10 @@ class TestLLM(unittest.TestCase):
         with self.assertRaises(Exception):
             ft_jsonl_validation([line for line in chats])
 
+        # lines without the messages key are reported as such
+        with self.assertRaisesRegex(Exception, "should have a 'messages' key"):
+            ft_jsonl_validation([{'chat': []}])
+
     def test_ft_code_formatter(self):
         df = pd.DataFrame({'code': ["".join(
             [